@@ -1,20 +1,69 @@
 import streamlit as st
-import pandas as pd
+import calendar
 import datetime
-from database import SimulatedDatabase
-from utils import PayrollCalculator, generate_payslip_pdf, generate_payslip_html
+import os
+import shutil
+import tempfile
+from database import LEAVE_TYPES, SimulatedDatabase
+from sqlite_database import SQLiteDatabase
+from attendance_analytics import summary_frame
+from attendance_import import import_attendance_csv
+from attendance_store import month_bounds
+from payslip_export import export_payslips_zip
+from payroll_export import export_disbursement
+from payslip_cache import PayslipCache
+from payroll_runner import PayrollRunner
+from payroll_ledger import PayrollLedger
+from payroll_jobs import PayrollJobQueue, COMPLETED, FAILED, CANCELLED
+from payroll_simulation import PayrollSimulator, scenario_grid
+from instrumentation import PROFILER, BUCKET_LABELS, span
+from lazy_imports import lazy_import
+from records import Employee, to_frame
+from utils import PayrollCalculator, generate_payslip_pdf, generate_payslip_html, batch_row_to_record
+
+# Loaded by the first screen that builds a DataFrame, so the login page never pays for it
+pd = lazy_import("pandas")
 
 # --- Configuration & Styles ---
 st.set_page_config(page_title="Helix Payroll | Enterprise Portal", layout="wide", page_icon="🏢")
 
 # Initialize Logic
-if 'db' not in st.session_state:
-    st.session_state.db = SimulatedDatabase()
-if 'calc' not in st.session_state:
-    st.session_state.calc = PayrollCalculator()
+# Data layer, calculator and runner are process-wide: every session shares one copy
+@st.cache_resource
+def get_database():
+    # HELIX_DB_PATH switches from the in-memory demo store to a SQLite file
+    db_path = os.environ.get("HELIX_DB_PATH")
+    if db_path:
+        return SQLiteDatabase(db_path)
+    # HELIX_SNAPSHOT_DIR maps a saved snapshot instead of seeding from scratch
+    snapshot_dir = os.environ.get("HELIX_SNAPSHOT_DIR")
+    if snapshot_dir and os.path.exists(os.path.join(snapshot_dir, "state.json")):
+        return SimulatedDatabase(snapshot_dir=snapshot_dir)
+    return SimulatedDatabase()
+
+@st.cache_resource
+def get_payroll_runner():
+    return PayrollRunner(get_database(), PayrollCalculator())
+
+@st.cache_resource
+def get_payroll_jobs():
+    # Batches run on a background worker so the script thread never waits on them; job
+    # status and results are kept on disk (HELIX_JOB_DIR) so they survive a restart
+    return PayrollJobQueue(get_payroll_runner(), store_dir=os.environ.get("HELIX_JOB_DIR", "payroll_jobs"))
+
+@st.cache_resource
+def get_payroll_ledger():
+    return PayrollLedger(os.environ.get("HELIX_LEDGER_DIR", "payroll_ledger"))
 
-db = st.session_state.db
-calc = st.session_state.calc
+@st.cache_resource
+def get_payslip_cache():
+    # Content-addressed, so one cache can serve every session
+    return PayslipCache(disk_dir=os.environ.get("HELIX_PAYSLIP_CACHE_DIR"))
+
+db = get_database()
+payroll_jobs = get_payroll_jobs()
+payroll_ledger = get_payroll_ledger()
+payslip_cache = get_payslip_cache()
 
 # --- Custom CSS for Enterprise Aesthetics ---
 st.markdown("""
@@ -165,20 +214,18 @@ def logout():
 def hr_dashboard():
     header("Executive Dashboard", f"Welcome back, {st.session_state.user['name']}")
     
-    # Top Metrics
-    employees = db.get_all_employees()
-    total_ctc = sum(e['ctc'] for e in employees)
+    # Top Metrics (maintained by the data layer on every write)
+    stats = db.get_dashboard_stats()
     
     c1, c2, c3, c4 = st.columns(4)
     with c1:
         with st.container(border=True):
-            st.metric("Total Headcount", len(employees), delta="Active")
+            st.metric("Total Headcount", stats['headcount'], delta="Active")
     with c2:
         with st.container(border=True):
-            st.metric("Annual CTC Flow", f"₹{total_ctc/1000000:.1f}M")
+            st.metric("Annual CTC Flow", f"₹{stats['total_ctc']/1000000:.1f}M")
     with c3:
-        cases = db.get_all_cases()
-        pending = len([c for c in cases if c['status'] == 'Open'])
+        pending = stats['open_cases']
         with st.container(border=True):
             st.metric("Pending Action Items", pending, delta=f"{pending} Urgent", delta_color="inverse")
     with c4:
@@ -191,35 +238,69 @@ def hr_dashboard():
     xc1, xc2 = st.columns([2, 1])
     with xc1:
         st.subheader("Department Distribution")
-        df_emp = pd.DataFrame(employees)
-        dept_counts = df_emp['department'].value_counts()
+        dept_counts = pd.Series(stats['department_counts']).sort_values(ascending=False)
         st.bar_chart(dept_counts, color="#3b82f6")
         
     with xc2:
         st.subheader("Attendance Heatmap")
-        # Simplified mock visualisation
-        att_data = {"Present": 85, "Absent": 5, "Leave": 10}
-        st.bar_chart(pd.Series(att_data), color="#10b981")
+        today = datetime.date.today()
+        daily = db.get_daily_attendance(today - datetime.timedelta(days=13), today)
+        daily = daily[["Present", "Half Day", "Absent", "Leave"]]
+        logged = daily.sum(axis=1)
+        if logged.any():
+            # Share of logged employees per day; week-offs are left out
+            ratios = daily[logged > 0].div(logged[logged > 0], axis=0) * 100
+            ratios.index = [d.strftime("%d %b") for d in ratios.index]
+            st.bar_chart(ratios, color=["#10b981", "#f59e0b", "#ef4444", "#6366f1"])
+        else:
+            st.info("No attendance logged in the last two weeks.")
 
 def hr_master_data():
     header("Master Registry", "Manage employee records and attendance.")
 
-    tab1, tab2, tab3 = st.tabs(["👥 Employee Directory", "💰 Compensation Update", "📥 Attendance Import"])
+    tab1, tab2, tab3, tab4 = st.tabs(["👥 Employee Directory", "💰 Compensation Update", "📥 Attendance Import",
+                                      "⏱️ Attendance Analytics"])
 
     with tab1:
-        employees = db.get_all_employees()
-        df = pd.DataFrame(employees)
-        if 'password' in df.columns: df = df.drop(columns=['password'])
-        
-        st.dataframe(
-            df.style.background_gradient(subset=['ctc'], cmap="Blues"), 
-            use_container_width=True,
-            column_config={
-                "ctc": st.column_config.NumberColumn("Annual CTC", format="₹%d"),
-                "basic": st.column_config.NumberColumn("Basic Pay", format="₹%d"),
-                "leave_balance": st.column_config.ProgressColumn("Leave Bal", min_value=0, max_value=30, format="%d days")
-            }
-        )
+        # Filtering, sorting and paging run in the data layer; only the visible page is styled
+        f1, f2, f3, f4 = st.columns(4)
+        dept = f1.selectbox("Department", ["All"] + db.get_departments())
+        desig = f2.selectbox("Designation", ["All"] + db.get_designations())
+        min_ctc = f3.number_input("Min CTC", min_value=0, value=0, step=100000)
+        max_ctc = f4.number_input("Max CTC (0 = no limit)", min_value=0, value=0, step=100000)
+        s1, s2, s3 = st.columns(3)
+        sort_labels = {"Employee ID": "emp_id", "Name": "name", "Annual CTC": "ctc", "Joining Date": "joining_date",
+                       "Department": "department", "Leave Balance": "leave_balance"}
+        sort_by = sort_labels[s1.selectbox("Sort by", list(sort_labels))]
+        descending = s2.toggle("Descending")
+        page_size = s3.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+        query = dict(department=None if dept == "All" else dept, designation=None if desig == "All" else desig,
+                     min_ctc=min_ctc or None, max_ctc=max_ctc or None, sort_by=sort_by, descending=descending)
+        page_no = st.session_state.get("directory_page", 1)
+        with span("ui.directory_query"):
+            employees, total = db.query_employees(**query, offset=(page_no - 1) * page_size, limit=page_size)
+        pages = max(1, -(-total // page_size))
+        if page_no > pages:
+            # Filters narrowed the result: jump to the last page that still exists
+            page_no = st.session_state.directory_page = pages
+            employees, total = db.query_employees(**query, offset=(page_no - 1) * page_size, limit=page_size)
+        with span("ui.directory_dataframe"):
+            df = to_frame(employees, [c for c in Employee.__slots__ if c not in ('password', 'bank_account', 'ifsc')])
+        first = (page_no - 1) * page_size
+        st.caption(f"Showing {first + 1:,}–{first + len(df):,} of {total:,} employees" if total else "No employees match these filters.")
+        # Styler is lazy: the gradient is computed when st.dataframe serialises it
+        with span("ui.directory_gradient"):
+            st.dataframe(
+                df.style.background_gradient(subset=['ctc'], cmap="Blues"), 
+                use_container_width=True,
+                column_config={
+                    "ctc": st.column_config.NumberColumn("Annual CTC", format="₹%d"),
+                    "basic": st.column_config.NumberColumn("Basic Pay", format="₹%d"),
+                    "leave_balance": st.column_config.ProgressColumn("Leave Bal", min_value=0, max_value=30, format="%d days")
+                }
+            )
+        st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key="directory_page")
 
     with tab2:
         with st.container(border=True):
@@ -243,17 +324,138 @@ def hr_master_data():
                 b3.metric("Special", f"₹{e['special']:,.0f}")
 
     with tab3:
-        st.file_uploader("Upload Biometric Log (CSV)", type=["csv"], help="Format: EmpID, Date, Status...")
+        upload = st.file_uploader("Upload Biometric Log (CSV)", type=["csv"], help="Format: EmpID, Date, Status...")
+        if upload is not None and st.button("Import Attendance", type="primary"):
+            status_box = st.empty()
+            try:
+                report = import_attendance_csv(
+                    upload, db, shift=get_payroll_runner().calc.shift,
+                    progress=lambda r: status_box.caption(f"{r.rows_read:,} rows read · {r.rows_per_second:,.0f} rows/s"))
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                i1, i2, i3 = st.columns(3)
+                i1.metric("Imported", f"{report.rows_imported:,}")
+                i2.metric("Rejected", f"{report.rows_rejected:,}")
+                i3.metric("Throughput", f"{report.rows_per_second:,.0f} rows/s")
+                if report.rejected_samples:
+                    st.dataframe(
+                        pd.DataFrame([{"Line": n, "Reason": reason, "Row": ",".join(map(str, row.values()))}
+                                  for n, reason, row in report.rejected_samples]),
+                        use_container_width=True
+                    )
         st.markdown("### Quick Override")
         with st.form("manual_att"):
             c1, c2, c3 = st.columns(3)
             override_emp = c1.selectbox("Employee", [e['emp_id'] for e in db.get_all_employees()])
             override_status = c2.selectbox("Status", ["Present", "Absent", "Half Day"])
             override_ot = c3.number_input("OT Hours", min_value=0.0)
+            t1, t2 = st.columns(2)
+            check_in = t1.time_input("Check-in", datetime.time(9, 0))
+            check_out = t2.time_input("Check-out", datetime.time(18, 0))
             if st.form_submit_button("Log Entry"):
-                db.add_attendance_log(override_emp, datetime.date.today(), override_status, ot_hours=override_ot)
+                punches = ("", "") if override_status == "Absent" else (check_in.strftime("%H:%M"), check_out.strftime("%H:%M"))
+                db.add_attendance_log(override_emp, datetime.date.today(), override_status, *punches, ot_hours=override_ot)
                 st.success("Logged.")
 
+    with tab4:
+        attendance_analytics()
+
+def attendance_analytics():
+    """Punctuality and overtime for one month, derived from punches for the whole workforce."""
+    today = datetime.date.today()
+    c1, c2 = st.columns(2)
+    month = c1.selectbox("Month", list(calendar.month_name)[1:], index=today.month - 1, key="analytics_month")
+    year = c2.number_input("Year", value=today.year, step=1, key="analytics_year")
+    month_no = list(calendar.month_name).index(month)
+    with span("ui.attendance_analytics"):
+        att = db.get_attendance_range(None, *month_bounds(int(year), month_no))
+        summary = summary_frame([e['emp_id'] for e in db.get_all_employees()], att)
+        summary = summary[summary['logs'] > 0]
+    if summary.empty:
+        st.info(f"No attendance logged for {month} {year}.")
+        return
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Late Arrivals", f"{summary['late_days'].sum():,}")
+    m2.metric("Early Exits", f"{summary['early_exits'].sum():,}")
+    m3.metric("Auto OT Hours", f"{summary['auto_ot_hours'].sum():,.1f}")
+    m4.metric("Missed Punches", f"{summary['missed_punches'].sum():,}")
+    top = summary.sort_values(['late_days', 'late_minutes'], ascending=False).head(200)
+    st.caption(f"{len(summary):,} employees with logs; the {len(top):,} most often late are listed.")
+    st.dataframe(top.drop(columns=['logs']), use_container_width=True)
+
+def load_job_results(job):
+    result = payroll_jobs.get_result(job.job_id)
+    if result is None:
+        # Its stored result is gone (e.g. the job store was cleared)
+        st.session_state.pop('batch_results', None)
+    else:
+        st.session_state.batch_results = result
+    st.session_state.batch_job = job.job_id
+
+@st.fragment(run_every=1.0)
+def payroll_job_status(job_id):
+    job = payroll_jobs.get_job(job_id)
+    if job is None:
+        return
+    if not job.finished:
+        c1, c2 = st.columns([4, 1])
+        c1.progress(job.progress, text=f"{job.job_id} · {job.month} {job.year} · {job.status} · {job.done:,}/{job.total:,} employees")
+        if c2.button("✖ Cancel", key=f"cancel_{job.job_id}", use_container_width=True):
+            payroll_jobs.cancel(job.job_id)
+        return
+    if job.status == COMPLETED:
+        if st.session_state.get('batch_job') != job.job_id:
+            # Finished while polling: rerun the whole page so the results below render
+            load_job_results(job)
+            st.rerun()
+        if 'batch_results' in st.session_state:
+            st.success(f"{job.job_id} completed: recomputed {job.recomputed:,} of {len(st.session_state.batch_results):,} employees for {job.month} {job.year}.")
+        else:
+            st.warning(f"{job.job_id} completed, but its results are no longer stored. Run the batch again.")
+    elif job.status == FAILED:
+        st.error(f"{job.job_id} failed: {job.error}")
+    elif job.status == CANCELLED:
+        st.warning(f"{job.job_id} was cancelled.")
+
+def parse_numbers(text):
+    return [float(v) for v in text.replace(",", " ").split()]
+
+def payroll_simulation():
+    st.caption("Cost of CTC revisions and statutory changes for the whole workforce. Live records are not touched.")
+    with st.form("what_if"):
+        c1, c2, c3 = st.columns(3)
+        increments = c1.text_input("CTC increments (%)", "0, 5, 8, 10")
+        pf_rates = c2.text_input("PF rates (%)", "12")
+        esi_limits = c3.text_input("ESI limits (₹ gross / month)", "21000")
+        c4, c5, c6 = st.columns(3)
+        start = c4.date_input("First month", datetime.date(2023, 10, 1))
+        n_months = c5.slider("Months", 1, 24, 12)
+        by_dept = c6.toggle("Break down by department")
+        submitted = st.form_submit_button("Simulate")
+    if submitted:
+        try:
+            scenarios = scenario_grid([v / 100 for v in parse_numbers(increments)],
+                                      PF_RATE=[v / 100 for v in parse_numbers(pf_rates)],
+                                      ESI_LIMIT=parse_numbers(esi_limits))
+        except ValueError:
+            st.error("Enter numbers separated by commas.")
+            return
+        first = start.year * 12 + start.month - 1
+        months = [(p // 12, p % 12 + 1) for p in range(first, first + n_months)]
+        with span("ui.payroll_simulation"):
+            st.session_state.what_if_table = PayrollSimulator(db).simulate(
+                scenarios, months, by="department" if by_dept else None)
+    table = st.session_state.get('what_if_table')
+    if table is None:
+        return
+    # Whole-period totals first; the per-month rows are below
+    summary = table.groupby('scenario', sort=False)[['gross_salary', 'net_salary', 'gross_change', 'net_change']].sum()
+    st.dataframe(summary, use_container_width=True, column_config={
+        col: st.column_config.NumberColumn(format="₹%d") for col in summary.columns
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
 def hr_payroll():
     header("Payroll Engine", "Compute, Review, and Disburse Salaries.")
     
@@ -263,36 +465,52 @@ def hr_payroll():
         y = c2.number_input("Year", value=2023)
         c3.markdown("##")
         if c3.button("🚀 Run Payroll Batch", type="primary", use_container_width=True):
-            # Batch Calc Logic
-            results = []
-            employees = db.get_all_employees()
-            progress = st.progress(0)
-            for i, emp in enumerate(employees):
-                # Mock attendance fetching
-                # In real app, filter for month
-                att = db.get_employee_attendance(emp['emp_id'])
-                # Flatten the att dict to list
-                att_list = []
-                for _, log in att.items(): att_list.append(log)
-                
-                sal = calc.calculate_salary(emp, att_list, m, y)
-                results.append(sal)
-                progress.progress((i+1)/len(employees))
-            
-            st.session_state.batch_results = results
-            st.success("Batch Completed!")
+            # Only employees changed since the last run of this month are recomputed
+            st.session_state.payroll_job = payroll_jobs.submit(m, y).job_id
+            st.session_state.pop('batch_results', None)
+
+    # Jobs are process-wide, so a refreshed session picks up the latest one
+    jobs = payroll_jobs.list_jobs()
+    job_id = st.session_state.get('payroll_job') or (jobs[0].job_id if jobs else None)
+    if job_id:
+        job = payroll_jobs.get_job(job_id)
+        if job is None:
+            # Left over from before a restart without a job store
+            st.session_state.pop('payroll_job', None)
+        else:
+            if job.status == COMPLETED and st.session_state.get('batch_job') != job_id:
+                load_job_results(job)
+            payroll_job_status(job_id)
+
+    with st.expander("Payroll History"):
+        summaries = payroll_ledger.get_summaries()
+        if summaries:
+            st.dataframe(
+                pd.DataFrame(summaries)[['month', 'version', 'rows', 'gross_salary', 'total_deductions', 'net_salary', 'finalized_at']],
+                use_container_width=True, hide_index=True
+            )
+        else:
+            st.caption("No finalized payroll yet.")
+
+    with st.expander("Recent Payroll Jobs"):
+        if jobs:
+            st.dataframe(pd.DataFrame([j.to_dict() for j in jobs[:20]]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No payroll jobs yet.")
+
+    with st.expander("What-if Simulation"):
+        payroll_simulation()
 
     if 'batch_results' in st.session_state:
         res = st.session_state.batch_results
         
         # Stats
-        total_payout = sum([r['net_salary'] for r in res])
+        total_payout = res['net_salary'].sum()
         st.metric("Total Net Payable", f"₹{total_payout:,.2f}")
         
         # Detailed Table
-        df_res = pd.DataFrame(res)
         st.dataframe(
-            df_res[['emp_id', 'name', 'gross_salary', 'total_deductions', 'net_salary']],
+            res[['emp_id', 'name', 'paid_days', 'ot_hours', 'gross_salary', 'total_deductions', 'net_salary']],
             use_container_width=True,
             column_config={
                 "gross_salary": st.column_config.NumberColumn("Gross", format="₹%d"),
@@ -301,25 +519,97 @@ def hr_payroll():
         )
         
         st.markdown("### Payslip Preview")
-        sel = st.selectbox("Select Employee", [r['emp_id'] for r in res])
-        target_rec = next(r for r in res if r['emp_id'] == sel)
+        sel = st.selectbox("Select Employee", res['emp_id'].tolist())
+        target_rec = batch_row_to_record(res[res['emp_id'] == sel].iloc[0])
         
         # HTML Preview
-        html_view = generate_payslip_html(target_rec)
+        html_view = payslip_cache.get_or_render("html", target_rec, generate_payslip_html)
         st.components.v1.html(html_view, height=600, scrolling=True)
         
         # Download
-        pdf_data = generate_payslip_pdf(target_rec)
+        pdf_data = payslip_cache.get_or_render("pdf", target_rec, generate_payslip_pdf)
         st.download_button("Download PDF Payslip", pdf_data, file_name=f"Payslip_{sel}.pdf", mime='application/pdf', type="primary")
 
+        # Finalize: append this batch to the payroll ledger as the month's next version
+        st.markdown("### Finalize")
+        if st.button("🔒 Finalize Payroll"):
+            month_name, year = res['month'].iloc[0].split("-")
+            month = datetime.datetime.strptime(month_name, "%B").month
+            entry = payroll_ledger.finalize(res, int(year), month)
+            st.success(f"Finalized {entry['month']} as version {entry['version']} ({entry['rows']:,} payslips).")
+
+        # Bulk Export
+        st.markdown("### Bulk Export")
+        if st.button("📦 Export All Payslips (ZIP)"):
+            bar = st.progress(0.0)
+            step = max(1, len(res) // 100)
+            def show_progress(r):
+                if r.done % step == 0 or r.done == r.total:
+                    bar.progress(r.done / r.total, text=f"{r.done:,}/{r.total:,} payslips · {r.pages_per_second:,.1f} pages/s")
+            # A private temp file per export, removed once read: sessions never share or leave one behind
+            with tempfile.TemporaryFile() as f:
+                report = export_payslips_zip(res, f, progress=show_progress)
+                f.seek(0)
+                st.session_state.payslip_zip = (f"Payslips_{res['month'].iloc[0]}.zip", f.read())
+            st.success(f"Rendered {report.pages:,} pages in {report.elapsed:.2f}s ({report.pages_per_second:,.1f} pages/s).")
+        if 'payslip_zip' in st.session_state:
+            name, data = st.session_state.payslip_zip
+            st.download_button("Download Payslips ZIP", data, file_name=name, mime='application/zip')
+
+        # Disbursement: bank transfer file, GL journal and Parquet archive in one pass
+        st.markdown("### Disbursement Files")
+        d1, d2 = st.columns(2)
+        debit_account = d1.text_input("Debit Account", value=os.environ.get("HELIX_DEBIT_ACCOUNT", ""))
+        value_date = d2.date_input("Value Date", value=datetime.date.today())
+        if st.button("🏦 Generate Disbursement Files", disabled=not debit_account.strip()):
+            # The transfer file holds account numbers: write to a private directory, keep the
+            # bytes for the download buttons and remove it
+            dest = tempfile.mkdtemp(prefix="helix_disbursement_")
+            try:
+                report = export_disbursement(res, dest, db, debit_account=debit_account, value_date=value_date)
+                files = {}
+                for fmt, path in report.files.items():
+                    with open(path, "rb") as f:
+                        files[fmt] = (os.path.basename(path), f.read())
+            finally:
+                shutil.rmtree(dest, ignore_errors=True)
+            st.session_state.disbursement = files
+            st.success(f"Wrote {report.done:,} rows in {report.elapsed:.2f}s: {report.paid:,} transfers totalling ₹{report.paid_amount:,.2f}.")
+            if report.skipped:
+                st.warning("Left out of the transfer file: " + ", ".join(f"{n:,} {reason}" for reason, n in report.skipped.items())
+                           + f" (e.g. {', '.join(report.skipped_ids[:10])}).")
+        if not debit_account.strip():
+            st.caption("Enter the company account the transfers are drawn on.")
+        files = st.session_state.get('disbursement')
+        if files:
+            mimes = {"neft": "text/csv", "journal": "text/csv", "parquet": "application/octet-stream"}
+            labels = {"neft": "Bank Transfer (CSV)", "journal": "GL Journal (CSV)", "parquet": "Parquet Archive"}
+            cols = st.columns(len(files))
+            for col, (fmt, (name, data)) in zip(cols, files.items()):
+                col.download_button(labels[fmt], data, file_name=name, mime=mimes[fmt], key=f"disburse_{fmt}")
+
 def hr_cases():
     header("Case Management", "Unified Helpdesk Console")
     
-    cases = db.get_all_cases()
-    if not cases:
-        st.info("No active tickets.")
+    f1, f2, f3 = st.columns([3, 1, 1])
+    query = f1.text_input("Search tickets", placeholder="e.g. laptop, payslip, vpn")
+    status = f2.selectbox("Status", ["All", "Open", "Resolved"])
+    page_size = f3.selectbox("Per page", [10, 25, 50], index=1)
+
+    search = dict(query=query, status=None if status == "All" else status)
+    page_no = st.session_state.get("cases_page", 1)
+    with span("ui.case_search"):
+        cases, total = db.search_cases(**search, offset=(page_no - 1) * page_size, limit=page_size)
+    pages = max(1, -(-total // page_size))
+    if page_no > pages:
+        page_no = st.session_state.cases_page = pages
+        cases, total = db.search_cases(**search, offset=(page_no - 1) * page_size, limit=page_size)
+    if not total:
+        st.info("No tickets match." if query or status != "All" else "No active tickets.")
         return
-        
+    first = (page_no - 1) * page_size
+    st.caption(f"Showing {first + 1:,}–{first + len(cases):,} of {total:,} tickets")
+
     for case in cases:
         with st.expander(f"{case['priority']} Priority: {case['category']} by {case['emp_id']} ({case['status']})", expanded=(case['status']=='Open')):
             st.markdown(f"**Description:** {case['description']}")
@@ -334,6 +624,101 @@ def hr_cases():
                         st.rerun()
             else:
                 st.success(f"Resolved: {case['hr_comments']}")
+    st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key="cases_page")
+
+def show_decisions(result, status):
+    if result['decided']:
+        st.success(f"{status} {len(result['decided']):,} request(s).")
+    if result['skipped']:
+        reasons = pd.Series(result['skipped'], name="reason").rename_axis("req_id")
+        st.warning(f"Skipped {len(reasons):,}: " + ", ".join(f"{r} ({n:,})" for r, n in reasons.value_counts().items()))
+        st.dataframe(reasons.head(50).reset_index(), use_container_width=True, hide_index=True)
+
+def hr_requests():
+    header("Request Approvals", "Leave, WFH and attendance corrections")
+
+    f1, f2, f3 = st.columns([3, 1, 1])
+    query = f1.text_input("Search requests", placeholder="e.g. annual, wfh, EMP002")
+    status = f2.selectbox("Status", ["Pending", "Approved", "Rejected", "All"])
+    page_size = f3.selectbox("Per page", [25, 50, 100], key="requests_page_size")
+
+    search = dict(query=query, status=None if status == "All" else status)
+    page_no = st.session_state.get("requests_page", 1)
+    with span("ui.request_search"):
+        reqs, total = db.search_requests(**search, offset=(page_no - 1) * page_size, limit=page_size)
+    pages = max(1, -(-total // page_size))
+    if page_no > pages:
+        page_no = st.session_state.requests_page = pages
+        reqs, total = db.search_requests(**search, offset=(page_no - 1) * page_size, limit=page_size)
+    if "request_result" in st.session_state:
+        show_decisions(*st.session_state.pop("request_result"))
+    if not total:
+        st.info("No requests match." if query or status != "Pending" else "No pending requests.")
+        return
+    first = (page_no - 1) * page_size
+    st.caption(f"Showing {first + 1:,}–{first + len(reqs):,} of {total:,} requests")
+
+    page = to_frame(reqs, ['req_id', 'emp_id', 'type', 'days', 'details', 'status', 'date'])
+    page.insert(0, "select", False)
+    edited = st.data_editor(
+        page, use_container_width=True, hide_index=True, disabled=list(page.columns[1:]),
+        column_config={"select": st.column_config.CheckboxColumn("✔", width="small")},
+        key=f"requests_editor_{status}_{query}_{page_no}"
+    )
+    selected = edited.loc[edited['select'], 'req_id'].tolist()
+
+    def decide(req_ids, decision):
+        with span("ui.decide_requests"):
+            result = db.decide_requests(req_ids, decision)
+        st.session_state.request_result = (result, decision)
+        st.rerun()
+
+    b1, b2, b3, b4 = st.columns(4)
+    if b1.button("✅ Approve Selected", disabled=not selected, use_container_width=True):
+        decide(selected, "Approved")
+    if b2.button("❌ Reject Selected", disabled=not selected, use_container_width=True):
+        decide(selected, "Rejected")
+    # Bulk actions cover every match, not only this page
+    if status == "Pending":
+        confirm = st.checkbox(f"Apply to all {total:,} matching requests")
+        if b3.button(f"Approve All ({total:,})", disabled=not confirm, use_container_width=True):
+            decide([r['req_id'] for r in db.search_requests(**search, limit=total)[0]], "Approved")
+        if b4.button(f"Reject All ({total:,})", disabled=not confirm, use_container_width=True):
+            decide([r['req_id'] for r in db.search_requests(**search, limit=total)[0]], "Rejected")
+    st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key="requests_page")
+
+def hr_diagnostics():
+    header("Diagnostics", "Where time goes in each rerun.")
+
+    c1, c2, c3 = st.columns([1, 1, 2])
+    # The profiler is process-wide: show its current state and change it only on a click,
+    # so a stale toggle in one session never flips it for everyone else
+    st.session_state.profile_toggle = PROFILER.enabled
+    c1.toggle("Collect timings", key="profile_toggle",
+              on_change=lambda: setattr(PROFILER, "enabled", st.session_state.profile_toggle))
+    if c2.button("Reset"):
+        PROFILER.reset()
+    c3.download_button("Export JSON", PROFILER.export_json(), file_name="helix_profile.json", mime="application/json")
+
+    snapshot_dir = os.environ.get("HELIX_SNAPSHOT_DIR")
+    if snapshot_dir and hasattr(db, "save_snapshot") and st.button("💾 Save Data Snapshot"):
+        with span("ui.save_snapshot"):
+            db.save_snapshot(snapshot_dir)
+        st.success(f"Snapshot written to {snapshot_dir}; new worker processes will map it at startup.")
+
+    rows = PROFILER.snapshot()
+    if not rows:
+        st.info("No samples yet. Enable collection and use the app.")
+        return
+
+    st.dataframe(
+        pd.DataFrame(rows).drop(columns=['histogram']),
+        use_container_width=True,
+        column_config={"alloc_blocks": st.column_config.NumberColumn("Net Alloc Blocks")}
+    )
+    sel = st.selectbox("Latency histogram", [r['name'] for r in rows])
+    hist = next(r['histogram'] for r in rows if r['name'] == sel)
+    st.bar_chart(pd.Series(hist).reindex(BUCKET_LABELS), color="#6366f1")
 
 # --- ESS Modules ---
 def ess_home():
@@ -349,7 +734,9 @@ def ess_home():
     c1, c2, c3 = st.columns(3)
     with c1:
         with st.container(border=True):
-            st.metric("Leave Balance", f"{u.get('leave_balance', 0)} Days")
+            # Re-read: approvals change the balance after login
+            balance = (db.get_employee(u['emp_id']) or u).get('leave_balance', 0)
+            st.metric("Leave Balance", f"{balance:g} Days")
     with c2:
         with st.container(border=True):
             st.metric("Structure", "Full Time")
@@ -357,10 +744,35 @@ def ess_home():
         with st.container(border=True):
             st.metric("Next Holiday", "Christmas")
             
+    # Finalized payslips from the payroll ledger
+    st.subheader("My Payslips")
+    history = payroll_ledger.get_employee_history(u['emp_id'])
+    if len(history):
+        st.dataframe(
+            history[['month', 'paid_days', 'gross_salary', 'total_deductions', 'net_salary']],
+            use_container_width=True, hide_index=True
+        )
+        sel = st.selectbox("Payslip", history['month'].tolist())
+        rec = batch_row_to_record(history[history['month'] == sel].iloc[0])
+        # Rendered only when clicked, so the overview never loads ReportLab
+        st.download_button("Download PDF Payslip", lambda: payslip_cache.get_or_render("pdf", rec, generate_payslip_pdf),
+                           file_name=f"Payslip_{u['emp_id']}_{sel}.pdf", mime='application/pdf')
+    else:
+        st.info("No finalized payslips yet.")
+
     # Attendance History
     st.subheader("My 30-Day Attendance")
     att = db.get_employee_attendance(u['emp_id'])
     if att:
+        today = datetime.date.today()
+        month_logs = db.get_attendance_range([u['emp_id']], *month_bounds(today.year, today.month))
+        if len(month_logs):
+            mine = summary_frame([u['emp_id']], month_logs).iloc[0]
+            a1, a2, a3, a4 = st.columns(4)
+            a1.metric("Hours This Month", f"{mine['worked_hours']:,.1f}")
+            a2.metric("Late Arrivals", f"{int(mine['late_days'])}")
+            a3.metric("Early Exits", f"{int(mine['early_exits'])}")
+            a4.metric("OT Hours", f"{mine['ot_hours']:,.1f}")
         data = [{"Date": d, **v} for d, v in att.items()]
         st.dataframe(pd.DataFrame(data).set_index("Date"), use_container_width=True)
     else:
@@ -374,19 +786,34 @@ def ess_requests():
     with tab1:
         with st.container(border=True):
             req_type = st.selectbox("I want to apply for...", ["Annual Leave", "Sick Leave", "WFH Request", "Missed Punch Correction"])
-            dt = st.date_input("For Date")
+            leave = req_type in LEAVE_TYPES
+            d1, d2 = st.columns(2)
+            dt = d1.date_input("From Date" if leave else "For Date")
+            end = d2.date_input("To Date", value=dt, min_value=dt) if leave else dt
             reason = st.text_area("Reason")
-            
+            # Leave is counted in working days; weekends inside the range are free
+            days = sum((dt + datetime.timedelta(days=i)).weekday() < 5 for i in range((end - dt).days + 1)) if leave else None
+
+            if leave:
+                st.caption(f"{days} working day(s)")
             if st.button("Submit Application", type="primary"):
-                db.submit_request(st.session_state.user['emp_id'], req_type, f"{dt}: {reason}")
-                st.success("Details forwarded to manager.")
+                if leave and not days:
+                    st.error("The selected dates fall on a weekend.")
+                else:
+                    period = f"{dt} to {end}" if end != dt else f"{dt}"
+                    db.submit_request(st.session_state.user['emp_id'], req_type, f"{period}: {reason}", days=days)
+                    st.success("Details forwarded to manager.")
                 
     with tab2:
         reqs = db.get_employee_requests(st.session_state.user['emp_id'])
         if reqs:
-            st.dataframe(pd.DataFrame(reqs)[['req_id', 'type', 'status', 'date']], use_container_width=True)
+            st.dataframe(to_frame(reqs, ['req_id', 'type', 'days', 'status', 'date']), use_container_width=True)
         else:
             st.caption("No history.")
+        ledger = db.get_leave_ledger(st.session_state.user['emp_id'])
+        if ledger:
+            st.markdown("### Leave Ledger")
+            st.dataframe(to_frame(ledger, ['date', 'req_id', 'reason', 'days', 'balance']), use_container_width=True, hide_index=True)
 
 def ess_help():
     header("Support Center", "Raise a ticket for HR or IT")
@@ -400,9 +827,7 @@ def ess_help():
             st.success("Ticket Created.")
             
     st.markdown("### My Open Tickets")
-    all_c = db.get_all_cases()
-    my_c = [c for c in all_c if c['emp_id'] == st.session_state.user['emp_id']]
-    for c in my_c:
+    for c in db.get_employee_cases(st.session_state.user['emp_id']):
         st.warning(f"{c['category']}: {c['status']}")
 
 # --- Main Routing ---
@@ -419,7 +844,7 @@ else:
         st.markdown("---")
         
         if user['role'] == "HR":
-            menu = st.radio("Menu", ["Dashboard", "Master Registry", "Payroll Engine", "Case Console"], label_visibility="collapsed")
+            menu = st.radio("Menu", ["Dashboard", "Master Registry", "Payroll Engine", "Requests", "Case Console", "Diagnostics"], label_visibility="collapsed")
         else:
             menu = st.radio("Menu", ["Overview", "My Requests", "Helpdesk"], label_visibility="collapsed")
             
@@ -427,12 +852,15 @@ else:
         if st.button("Logout", use_container_width=True):
             logout()
             
-    if user['role'] == "HR":
-        if menu == "Dashboard": hr_dashboard()
-        elif menu == "Master Registry": hr_master_data()
-        elif menu == "Payroll Engine": hr_payroll()
-        elif menu == "Case Console": hr_cases()
-    else:
-        if menu == "Overview": ess_home()
-        elif menu == "My Requests": ess_requests()
-        elif menu == "Helpdesk": ess_help()
+    with span(f"page.{menu}"):
+        if user['role'] == "HR":
+            if menu == "Dashboard": hr_dashboard()
+            elif menu == "Master Registry": hr_master_data()
+            elif menu == "Payroll Engine": hr_payroll()
+            elif menu == "Requests": hr_requests()
+            elif menu == "Case Console": hr_cases()
+            elif menu == "Diagnostics": hr_diagnostics()
+        else:
+            if menu == "Overview": ess_home()
+            elif menu == "My Requests": ess_requests()
+            elif menu == "Helpdesk": ess_help()
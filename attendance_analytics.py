@@ -0,0 +1,184 @@
+import numpy as np
+
+from attendance_store import NO_TIME, STATUS_CODES, STATUS_NAMES, parse_hhmm
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+PRESENT, HALF_DAY, WEEK_OFF = STATUS_CODES["Present"], STATUS_CODES["Half Day"], STATUS_CODES["Week Off"]
+OT_SOURCES = ("manual", "punches", "max")
+
+# employee_summary() columns, in order
+SUMMARY_COLUMNS = ["logs", "paid_days", "worked_hours", "late_days", "late_minutes", "early_exits",
+                   "early_minutes", "missed_punches", "manual_ot_hours", "auto_ot_hours", "ot_hours"]
+
+
+class ShiftPolicy:
+    """Shift timings and the overtime / punctuality rules applied to punches.
+
+    start / end: "HH:MM" shift times; a check-out earlier than check-in is taken as the
+    next morning. A Present day is late when check-in is more than grace_minutes after
+    start, and an early exit when check-out is more than early_grace_minutes before end.
+    Overtime is time worked past end (all of it on a Week Off), counted from
+    min_ot_minutes, in whole ot_block_minutes and at most max_ot_hours a day.
+    ot_source: which overtime payroll pays - "manual" (the logged ot_hours), "punches"
+    (derived) or "max" (the larger of the two, per day).
+    late_marks_per_half_day: every that many late days cost half a paid day; 0 disables it.
+    """
+
+    def __init__(self, start="09:00", end="18:00", grace_minutes=10, early_grace_minutes=10,
+                 min_ot_minutes=30, ot_block_minutes=30, max_ot_hours=4.0, ot_source="max",
+                 late_marks_per_half_day=0):
+        if ot_source not in OT_SOURCES:
+            raise ValueError(f"ot_source must be one of {', '.join(OT_SOURCES)}")
+        self.start = parse_hhmm(start)
+        self.end = parse_hhmm(end)
+        self.grace_minutes = grace_minutes
+        self.early_grace_minutes = early_grace_minutes
+        self.min_ot_minutes = min_ot_minutes
+        self.ot_block_minutes = max(1, ot_block_minutes)
+        self.max_ot_hours = max_ot_hours
+        self.ot_source = ot_source
+        self.late_marks_per_half_day = late_marks_per_half_day
+
+
+DEFAULT_SHIFT = ShiftPolicy()
+
+
+def punch_minutes(values):
+    """Punch times (minutes since midnight, or "HH:MM" strings) -> int32 array, NO_TIME when blank."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int32)
+    if values.dtype.kind == "f":
+        return np.where(np.isnan(values), NO_TIME, values).astype(np.int32)
+    return np.array([NO_TIME if v is None or v != v else parse_hhmm(v) for v in values], dtype=np.int32)
+
+
+def status_codes(values):
+    """Status names (or an STATUS_NAMES categorical) -> int8 codes; missing or unknown -> -1."""
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype) and list(values.cat.categories) == STATUS_NAMES:
+        return values.cat.codes.to_numpy()
+    return np.array([STATUS_CODES.get(v, -1) for v in values], dtype=np.int8)
+
+
+def daily_metrics(status, check_in, check_out, ot_hours, policy=DEFAULT_SHIFT):
+    """Per employee-day metrics as arrays keyed by name, all aligned with the inputs.
+
+    status: int8 codes (see status_codes); check_in / check_out: minutes, NO_TIME when
+    missing; ot_hours: overtime logged by hand. Keys: paid_day (1, 0.5 or 0),
+    worked_hours, late_minutes, early_minutes (0 unless late / early), missed_punch,
+    manual_ot_hours, auto_ot_hours and ot_hours (what payroll pays under policy.ot_source).
+    """
+    status = np.asarray(status)
+    check_in, check_out = np.asarray(check_in), np.asarray(check_out)
+    punched = (check_in != NO_TIME) & (check_out != NO_TIME)
+    attended = (status == PRESENT) | (status == HALF_DAY)
+    present = punched & (status == PRESENT)
+
+    out_min = np.where(punched & (check_out < check_in), check_out + 1440, check_out).astype(np.int32)
+    worked = np.where(punched, out_min - check_in, 0)
+
+    late = np.where(present & (check_in > policy.start + policy.grace_minutes), check_in - policy.start, 0)
+    early = np.where(present & (out_min < policy.end - policy.early_grace_minutes), policy.end - out_min, 0)
+
+    # Past the shift end on a working day, everything on a week off
+    extra = np.where(present, out_min - np.maximum(policy.end, check_in), 0)
+    extra = np.where(punched & (status == WEEK_OFF), worked, extra)
+    extra = np.where(extra >= policy.min_ot_minutes, extra // policy.ot_block_minutes * policy.ot_block_minutes, 0)
+    auto_ot = np.minimum(extra / 60.0, policy.max_ot_hours)
+
+    manual_ot = np.nan_to_num(np.asarray(ot_hours, dtype=np.float64))
+    if policy.ot_source == "manual":
+        paid_ot = manual_ot
+    elif policy.ot_source == "punches":
+        paid_ot = auto_ot
+    else:
+        paid_ot = np.maximum(manual_ot, auto_ot)
+
+    return {
+        "paid_day": np.where(status == PRESENT, 1.0, np.where(status == HALF_DAY, 0.5, 0.0)),
+        "worked_hours": worked / 60.0,
+        "late_minutes": late,
+        "early_minutes": early,
+        "missed_punch": attended & ~punched,
+        "manual_ot_hours": manual_ot,
+        "auto_ot_hours": auto_ot,
+        "ot_hours": paid_ot,
+    }
+
+
+def _columns(attendance):
+    """(emp_id, status codes, check_in, check_out, ot_hours) from a frame or list of dicts.
+
+    emp_id stays a Series for frames: converting pandas' Arrow-backed strings to Python
+    objects would cost more than everything else here.
+    """
+    if hasattr(attendance, "columns"):
+        n = len(attendance)
+        col = lambda c, fill: attendance[c] if c in attendance.columns else np.full(n, fill)
+        status = status_codes(attendance["status"]) if "status" in attendance.columns else np.full(n, -1, np.int8)
+        ot = pd.to_numeric(attendance["ot_hours"], errors="coerce").to_numpy(dtype=float) if "ot_hours" in attendance.columns else np.zeros(n)
+        return (col("emp_id", None), status, punch_minutes(col("check_in", NO_TIME)),
+                punch_minutes(col("check_out", NO_TIME)), ot)
+    logs = list(attendance)
+    return (np.array([log.get("emp_id") for log in logs], dtype=object),
+            status_codes([log.get("status") for log in logs]),
+            punch_minutes([log.get("check_in") for log in logs]),
+            punch_minutes([log.get("check_out") for log in logs]),
+            np.array([float(log.get("ot_hours") or 0) for log in logs]))
+
+
+def employee_summary(emp_ids, attendance, policy=DEFAULT_SHIFT, working_days=30):
+    """Month totals per employee as arrays keyed by SUMMARY_COLUMNS, aligned with emp_ids.
+
+    attendance: DataFrame (get_attendance_range() layout) or list of dicts with emp_id,
+    status, check_in, check_out and ot_hours; logs of employees not in emp_ids are ignored,
+    and when emp_ids holds a single employee the logs need no emp_id at all. Employees
+    without logs are paid for the full month, as payroll does when attendance is missing.
+    """
+    emp_ids = list(emp_ids)
+    n = len(emp_ids)
+    att_ids, status, check_in, check_out, ot = _columns(attendance)
+    if n == 1:
+        # A single employee's logs (calculate_salary) skip building an index
+        att_ids = np.asarray(att_ids, dtype=object)
+        pos = np.where((att_ids == emp_ids[0]) | (att_ids == None), 0, -1)  # noqa: E711
+    else:
+        # Hashing the strings once (factorize) and looking up only the distinct ids is
+        # several times faster than get_indexer over every log
+        codes, uniques = pd.factorize(att_ids)
+        pos = np.append(pd.Index(emp_ids).get_indexer(uniques), -1)[codes]
+    keep = pos >= 0
+    if not keep.all():
+        pos, status, check_in, check_out, ot = pos[keep], status[keep], check_in[keep], check_out[keep], ot[keep]
+
+    day = daily_metrics(status, check_in, check_out, ot, policy)
+    # bincount returns int64 when there is nothing to sum; keep the dtypes fixed
+    total = lambda values: np.bincount(pos, weights=values, minlength=n).astype(np.float64)
+
+    logs = np.bincount(pos, minlength=n)
+    late_days = np.bincount(pos, weights=day["late_minutes"] > 0, minlength=n)
+    paid_days = total(day["paid_day"])
+    if policy.late_marks_per_half_day:
+        paid_days = np.maximum(paid_days - late_days // policy.late_marks_per_half_day * 0.5, 0.0)
+    return {
+        "logs": logs,
+        "paid_days": np.where(logs > 0, paid_days, float(working_days)),
+        "worked_hours": np.round(total(day["worked_hours"]), 2),
+        "late_days": late_days.astype(np.int64),
+        "late_minutes": total(day["late_minutes"]).astype(np.int64),
+        "early_exits": np.bincount(pos, weights=day["early_minutes"] > 0, minlength=n).astype(np.int64),
+        "early_minutes": total(day["early_minutes"]).astype(np.int64),
+        "missed_punches": np.bincount(pos, weights=day["missed_punch"], minlength=n).astype(np.int64),
+        "manual_ot_hours": total(day["manual_ot_hours"]),
+        "auto_ot_hours": total(day["auto_ot_hours"]),
+        "ot_hours": total(day["ot_hours"]),
+    }
+
+
+def summary_frame(emp_ids, attendance, policy=DEFAULT_SHIFT, working_days=30):
+    """employee_summary() as a DataFrame indexed by emp_id."""
+    emp_ids = list(emp_ids)
+    summary = employee_summary(emp_ids, attendance, policy, working_days)
+    return pd.DataFrame(summary, index=pd.Index(emp_ids, name="emp_id"), columns=SUMMARY_COLUMNS)
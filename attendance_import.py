@@ -0,0 +1,138 @@
+import csv
+import datetime
+import io
+import math
+import time
+
+from attendance_analytics import DEFAULT_SHIFT
+from attendance_store import STATUS_NAMES
+from instrumentation import timed
+
+VALID_STATUSES = set(STATUS_NAMES)
+REQUIRED_COLUMNS = ["EmpID", "Date", "Status"]
+
+
+class ImportReport:
+    def __init__(self, max_rejected_samples=100):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rows_rejected = 0
+        self.rejected_samples = []  # (line_no, reason, raw row), capped
+        self.max_rejected_samples = max_rejected_samples
+        self.elapsed = 0.0
+
+    def reject(self, line_no, reason, row):
+        self.rows_rejected += 1
+        if len(self.rejected_samples) < self.max_rejected_samples:
+            self.rejected_samples.append((line_no, reason, row))
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _parse_time(value):
+    """Returns minutes since midnight for 'HH:MM', None for blank, raises ValueError otherwise."""
+    if not value:
+        return None
+    hh, sep, mm = value.partition(":")
+    if not sep or len(mm) != 2:
+        raise ValueError(value)
+    h, m = int(hh), int(mm)
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError(value)
+    return h * 60 + m
+
+
+def validate_row(row, known_emp_ids=None, shift=DEFAULT_SHIFT):
+    """Validates one CSV row. Returns (log_tuple, None) or (None, reason).
+
+    shift: the ShiftPolicy the punches are worked against; a CheckOut earlier than CheckIn is
+    only accepted when that shift runs past midnight, and is otherwise a swapped punch.
+    """
+    emp_id = (row.get("EmpID") or "").strip()
+    if not emp_id:
+        return None, "missing EmpID"
+    if known_emp_ids is not None and emp_id not in known_emp_ids:
+        return None, f"unknown EmpID {emp_id}"
+
+    date_str = (row.get("Date") or "").strip()
+    try:
+        date_str = datetime.date.fromisoformat(date_str).isoformat()
+    except ValueError:
+        return None, f"bad Date {date_str!r}"
+
+    status = (row.get("Status") or "").strip()
+    if status not in VALID_STATUSES:
+        return None, f"bad Status {status!r}"
+
+    check_in = (row.get("CheckIn") or "").strip()
+    check_out = (row.get("CheckOut") or "").strip()
+    try:
+        in_minutes = _parse_time(check_in)
+        out_minutes = _parse_time(check_out)
+    except ValueError:
+        return None, f"bad CheckIn/CheckOut {check_in!r}/{check_out!r}"
+    if in_minutes is not None and out_minutes is not None and out_minutes < in_minutes and shift.end >= shift.start:
+        return None, f"CheckOut {check_out} before CheckIn {check_in}"
+
+    try:
+        ot_hours = float(row.get("OTHours") or 0)
+    except ValueError:
+        return None, f"bad OTHours {row.get('OTHours')!r}"
+    if not math.isfinite(ot_hours):
+        return None, f"bad OTHours {row.get('OTHours')!r}"
+    if ot_hours < 0:
+        return None, "negative OTHours"
+
+    return (emp_id, date_str, status, check_in, check_out, ot_hours), None
+
+
+@timed("import.attendance_csv")
+def import_attendance_csv(source, db, chunk_size=50000, progress=None, shift=DEFAULT_SHIFT):
+    """Streams a biometric CSV (sample_attendance.csv layout) into db in bounded memory.
+
+    source: path, text file or binary file object (e.g. a Streamlit UploadedFile); a UTF-8
+    byte-order mark, as Excel writes, is skipped
+    progress: optional callback(report) invoked after every flushed chunk
+    shift: ShiftPolicy of the imported punches (see validate_row)
+    Only one chunk of parsed rows is held at a time; the file is never loaded whole.
+    """
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return import_attendance_csv(f, db, chunk_size, progress, shift)
+    if not isinstance(source, io.TextIOBase):
+        source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    report = ImportReport()
+    start = time.perf_counter()
+    known_emp_ids = {e['emp_id'] for e in db.get_all_employees()}
+
+    reader = csv.DictReader(source)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Attendance CSV is missing columns: {', '.join(missing)}")
+
+    chunk = []
+    for line_no, row in enumerate(reader, start=2):
+        report.rows_read += 1
+        log, reason = validate_row(row, known_emp_ids, shift)
+        if reason:
+            report.reject(line_no, reason, row)
+            continue
+        chunk.append(log)
+        if len(chunk) >= chunk_size:
+            db.add_attendance_logs(chunk)
+            report.rows_imported += len(chunk)
+            chunk = []
+            report.elapsed = time.perf_counter() - start
+            if progress:
+                progress(report)
+
+    if chunk:
+        db.add_attendance_logs(chunk)
+        report.rows_imported += len(chunk)
+    report.elapsed = time.perf_counter() - start
+    if progress:
+        progress(report)
+    return report
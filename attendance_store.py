@@ -0,0 +1,272 @@
+import calendar
+import datetime
+import json
+import os
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from records import AttendanceLog
+
+pd = lazy_import("pandas")
+
+# Status is stored as a small integer code; -1 marks "no log for this day"
+STATUS_NAMES = ["Absent", "Present", "Half Day", "Week Off", "Leave"]
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+NO_LOG = -1
+NO_TIME = -1
+
+
+def check_statuses(statuses):
+    """Raises ValueError for the first status that is not in STATUS_NAMES."""
+    for status in statuses:
+        if status not in STATUS_CODES:
+            raise ValueError(f"Unknown attendance status {status!r}")
+
+
+def parse_hhmm(value):
+    """'HH:MM' -> minutes since midnight, '' / None -> NO_TIME."""
+    if not value:
+        return NO_TIME
+    hh, _, mm = str(value).partition(":")
+    return int(hh) * 60 + int(mm)
+
+
+def format_hhmm(minutes):
+    return "" if minutes < 0 else f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def to_period(date):
+    """Partition key (yyyymm) of a date."""
+    d = to_date(date)
+    return d.year * 100 + d.month
+
+
+def month_bounds(year, month):
+    """First and last date of a calendar month."""
+    return datetime.date(year, month, 1), datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+
+COLUMNS = ("status", "check_in", "check_out", "ot_hours", "day_counts")
+
+
+class MonthPartition:
+    """Dense (employee x day) columns for one calendar month.
+
+    Every employee has at most one log per day, so each column is a 2-D array indexed by
+    (employee ordinal, day - 1). Upserts and point lookups are plain array indexing.
+    day_counts[day - 1, code] keeps the number of employees with each status per day.
+    """
+
+    def __init__(self, capacity=64):
+        self.status = np.full((capacity, 31), NO_LOG, dtype=np.int8)
+        self.check_in = np.full((capacity, 31), NO_TIME, dtype=np.int16)
+        self.check_out = np.full((capacity, 31), NO_TIME, dtype=np.int16)
+        self.ot_hours = np.zeros((capacity, 31), dtype=np.float64)
+        self.day_counts = np.zeros((31, len(STATUS_NAMES)), dtype=np.int64)
+
+    @classmethod
+    def load(cls, path, key, mmap_mode="c"):
+        part = cls.__new__(cls)
+        for name in COLUMNS:
+            setattr(part, name, np.load(os.path.join(path, f"{key}_{name}.npy"), mmap_mode=mmap_mode))
+        return part
+
+    def save(self, path, key, n_rows):
+        for name in COLUMNS:
+            arr = getattr(self, name)
+            np.save(os.path.join(path, f"{key}_{name}.npy"), arr if name == "day_counts" else arr[:n_rows])
+
+    def ensure_capacity(self, n_rows):
+        capacity = len(self.status)
+        if n_rows <= capacity:
+            return
+        capacity = max(capacity, 64)
+        while capacity < n_rows:
+            capacity *= 2
+        for name, fill in (("status", NO_LOG), ("check_in", NO_TIME), ("check_out", NO_TIME), ("ot_hours", 0)):
+            old = getattr(self, name)
+            grown = np.full((capacity, 31), fill, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+
+class AttendanceStore:
+    """Attendance partitioned by year-month (key yyyymm) in compact numeric columns.
+
+    Dates are handled as integers (yyyymmdd), punch times as minutes since midnight and
+    status as an int8 code into STATUS_NAMES.
+    """
+
+    def __init__(self):
+        self.partitions = {}  # yyyymm -> MonthPartition
+        self.emp_ordinal = {}  # emp_id -> row in every partition
+        self.emp_ids = []
+
+    def save(self, path):
+        """Writes every partition as plain .npy files plus a small meta.json."""
+        os.makedirs(path, exist_ok=True)
+        for key, part in self.partitions.items():
+            part.save(path, key, len(self.emp_ids))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"emp_ids": self.emp_ids, "partitions": sorted(self.partitions)}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="c"):
+        """Maps a saved store instead of reading it.
+
+        With the default copy-on-write mode nothing is read up front, worker processes
+        share the pages through the OS page cache, and a partition only gets a private
+        copy of the pages an upsert touches.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        store = cls()
+        store.emp_ids = meta["emp_ids"]
+        store.emp_ordinal = {emp_id: i for i, emp_id in enumerate(store.emp_ids)}
+        store.partitions = {key: MonthPartition.load(path, key, mmap_mode) for key in meta["partitions"]}
+        return store
+
+    def _ordinal(self, emp_id):
+        ordinal = self.emp_ordinal.get(emp_id)
+        if ordinal is None:
+            ordinal = self.emp_ordinal[emp_id] = len(self.emp_ids)
+            self.emp_ids.append(emp_id)
+        return ordinal
+
+    def _partition(self, key):
+        part = self.partitions.get(key)
+        if part is None:
+            part = self.partitions[key] = MonthPartition(max(64, len(self.emp_ids)))
+        part.ensure_capacity(len(self.emp_ids))
+        return part
+
+    def upsert(self, emp_id, date, status, check_in="", check_out="", ot_hours=0):
+        # Checked before anything is created, so a bad row leaves no trace
+        check_statuses([status])
+        d = to_date(date)
+        ordinal = self._ordinal(emp_id)
+        part = self._partition(to_period(d))
+        day = d.day - 1
+        code = STATUS_CODES[status]
+        old = part.status[ordinal, day]
+        if old != NO_LOG:
+            part.day_counts[day, old] -= 1
+        part.day_counts[day, code] += 1
+        part.status[ordinal, day] = code
+        part.check_in[ordinal, day] = parse_hhmm(check_in)
+        part.check_out[ordinal, day] = parse_hhmm(check_out)
+        part.ot_hours[ordinal, day] = float(ot_hours or 0)
+
+    def bulk_upsert(self, rows):
+        # rows of (emp_id, date, status, check_in, check_out, ot_hours); all or nothing on bad statuses
+        rows = list(rows)
+        check_statuses({row[2] for row in rows})
+        for emp_id, date, status, check_in, check_out, ot_hours in rows:
+            self.upsert(emp_id, date, status, check_in, check_out, ot_hours)
+
+    def get(self, emp_id, date):
+        d = to_date(date)
+        ordinal = self.emp_ordinal.get(emp_id)
+        part = self.partitions.get(d.year * 100 + d.month)
+        if ordinal is None or part is None or ordinal >= len(part.status):
+            return None
+        return self._decode(part, ordinal, d.day - 1)
+
+    def get_employee_logs(self, emp_id):
+        """All logs of one employee as {date_str: log}, newest first."""
+        ordinal = self.emp_ordinal.get(emp_id)
+        logs = {}
+        if ordinal is None:
+            return logs
+        for key in sorted(self.partitions, reverse=True):
+            part = self.partitions[key]
+            if ordinal >= len(part.status):
+                continue
+            for day in np.flatnonzero(part.status[ordinal] != NO_LOG)[::-1]:
+                logs[f"{key // 100:04d}-{key % 100:02d}-{day + 1:02d}"] = self._decode(part, ordinal, day)
+        return logs
+
+    def _decode(self, part, ordinal, day):
+        code = part.status[ordinal, day]
+        if code == NO_LOG:
+            return None
+        return AttendanceLog.from_values((
+            STATUS_NAMES[code],
+            format_hhmm(int(part.check_in[ordinal, day])),
+            format_hhmm(int(part.check_out[ordinal, day])),
+            float(part.ot_hours[ordinal, day])
+        ))
+
+    def get_daily_counts(self, start, end):
+        """Employees per status for each day in [start, end], read from the running counts.
+
+        Returns a DataFrame indexed by date with one column per STATUS_NAMES entry; days
+        without any log are left out.
+        """
+        start, end = to_date(start), to_date(end)
+        dates, counts = [], []
+        d = start
+        while d <= end:
+            part = self.partitions.get(d.year * 100 + d.month)
+            if part is not None and part.day_counts[d.day - 1].any():
+                dates.append(d)
+                counts.append(part.day_counts[d.day - 1])
+            d += datetime.timedelta(days=1)
+        return pd.DataFrame(np.array(counts, dtype=np.int64).reshape(-1, len(STATUS_NAMES)),
+                            index=pd.Index(dates, name="date"), columns=STATUS_NAMES)
+
+    def get_range(self, emp_ids, start, end):
+        """Logs between start and end (inclusive) as a columnar DataFrame.
+
+        emp_ids: iterable of emp_ids, or None for everyone.
+        Columns: emp_id, date (int yyyymmdd), status (categorical), check_in / check_out
+        (minutes, -1 when blank), ot_hours. Only the partitions in range are touched.
+        """
+        start, end = to_date(start), to_date(end)
+        if emp_ids is None:
+            ordinals = np.arange(len(self.emp_ids))
+        else:
+            ordinals = np.array([self.emp_ordinal[e] for e in emp_ids if e in self.emp_ordinal], dtype=np.int64)
+        emp_lookup = np.array(self.emp_ids, dtype=object)
+
+        frames = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            part = self.partitions.get(year * 100 + month)
+            # Employees added after this partition was last written have no rows in it
+            part_ordinals = ordinals[ordinals < len(part.status)] if part is not None else ordinals[:0]
+            if len(part_ordinals):
+                first_day = start.day if (year, month) == (start.year, start.month) else 1
+                last_day = end.day if (year, month) == (end.year, end.month) else 31
+                cols = slice(first_day - 1, last_day)
+                status = part.status[part_ordinals, cols]
+                rows, days = np.nonzero(status != NO_LOG)
+                sel_ord = part_ordinals[rows]
+                sel_day = days + first_day - 1
+                frames.append(pd.DataFrame({
+                    "emp_id": emp_lookup[sel_ord],
+                    "date": (year * 100 + month) * 100 + sel_day + 1,
+                    "status": status[rows, days],
+                    "check_in": part.check_in[sel_ord, sel_day],
+                    "check_out": part.check_out[sel_ord, sel_day],
+                    "ot_hours": part.ot_hours[sel_ord, sel_day],
+                }))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            df = pd.DataFrame({"emp_id": pd.Series(dtype=object), "date": pd.Series(dtype=np.int64),
+                               "status": pd.Series(dtype=np.int8), "check_in": pd.Series(dtype=np.int16),
+                               "check_out": pd.Series(dtype=np.int16), "ot_hours": pd.Series(dtype=np.float64)})
+        df["status"] = pd.Categorical.from_codes(df["status"].to_numpy(), STATUS_NAMES)
+        return df
@@ -0,0 +1,176 @@
+"""Payroll engine benchmarks.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --out bench.json
+    python benchmarks/run_benchmarks.py --sizes 1000 --baseline bench.json
+
+Each result records wall time and throughput; with --baseline, any benchmark whose
+throughput dropped by more than --tolerance is reported and the exit code is 1.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_import import import_attendance_csv
+from attendance_store import month_bounds
+from database import SimulatedDatabase
+from sqlite_database import SQLiteDatabase
+from payroll_export import export_disbursement
+from payroll_simulation import PayrollSimulator, scenario_grid
+from utils import PayrollCalculator, batch_row_to_record, generate_payslip_html, generate_payslip_pdf
+from benchmarks.synthetic import generate_employees, generate_attendance, write_attendance_csv
+
+YEAR, MONTH, MONTH_NAME = 2023, 10, "October"
+
+
+def timed(fn, repeat=1):
+    """Best wall time of `repeat` calls, plus the last return value."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+class Results:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, size, name, seconds, ops, unit):
+        self.rows.append({"size": size, "benchmark": name, "seconds": round(seconds, 6), "ops": ops,
+                          "unit": unit, "ops_per_sec": round(ops / seconds, 2) if seconds > 0 else None})
+        print(f"{size:>8,}  {name:<28} {seconds:>9.3f}s  {ops / seconds if seconds else 0:>14,.1f} {unit}/s")
+
+
+def bench_size(n, months, results, import_limit, seed):
+    employees = generate_employees(n, seed)
+    rng = random.Random(seed)
+    sample_ids = [rng.choice(employees)['emp_id'] for _ in range(10000)]
+
+    # Data layer
+    db = SimulatedDatabase()
+    seconds, _ = timed(lambda: [db.add_employee(e) for e in employees])
+    results.add(n, "db_add_employees", seconds, n, "employees")
+    rows = list(generate_attendance(employees, YEAR, MONTH, months, seed))
+    seconds, _ = timed(lambda: db.add_attendance_logs(rows))
+    results.add(n, "db_bulk_attendance", seconds, len(rows), "rows")
+    del rows
+
+    seconds, _ = timed(lambda: [db.get_employee(e) for e in sample_ids], repeat=3)
+    results.add(n, "db_get_employee", seconds, len(sample_ids), "lookups")
+    seconds, _ = timed(lambda: [db.authenticate(f"e{e[1:]}@company.com", "emp", "Employee") for e in sample_ids], repeat=3)
+    results.add(n, "db_authenticate", seconds, len(sample_ids), "lookups")
+
+    month_start, month_end = month_bounds(YEAR, MONTH)
+    seconds, att = timed(lambda: db.get_attendance_range(None, month_start, month_end), repeat=3)
+    results.add(n, "db_attendance_range", seconds, len(att), "rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sdb = SQLiteDatabase(os.path.join(tmp, "bench.db"))
+        for e in employees:
+            sdb.add_employee(e)
+        seconds, _ = timed(lambda: [sdb.get_employee(e) for e in sample_ids], repeat=3)
+        results.add(n, "sqlite_get_employee", seconds, len(sample_ids), "lookups")
+        sdb._conn().close()
+
+    # Payroll engine
+    calc = PayrollCalculator()
+    seconds, batch = timed(lambda: calc.calculate_batch(db.get_all_employees(), att, MONTH_NAME, YEAR), repeat=3)
+    results.add(n, "calculate_batch", seconds, n, "employees")
+
+    grid = scenario_grid([0.0, 0.05, 0.08, 0.10], PF_RATE=[0.12, 0.10], ESI_LIMIT=[21000, 25000])
+    simulator = PayrollSimulator(db, calc)
+    seconds, _ = timed(lambda: simulator.simulate(grid, [(YEAR, MONTH)]))
+    results.add(n, "simulate_grid", seconds, n * (len(grid) + 1), "employee_scenarios")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seconds, _ = timed(lambda: export_disbursement(batch, tmp, db, debit_account="000405001234"))
+        results.add(n, "export_disbursement", seconds, n, "employees")
+
+    loop_n = min(n, 10000)
+    logs = {}
+    for emp_id, status, ot in zip(att['emp_id'], att['status'], att['ot_hours']):
+        logs.setdefault(emp_id, []).append({"status": status, "ot_hours": ot})
+    loop_emps = employees[:loop_n]
+    seconds, _ = timed(lambda: [calc.calculate_salary(e, logs.get(e['emp_id'], []), MONTH_NAME, YEAR) for e in loop_emps])
+    results.add(n, "calculate_salary_loop", seconds, loop_n, "employees")
+    del logs
+
+    # Rendering (sampled; cost per slip does not depend on headcount)
+    records = [batch_row_to_record(row) for _, row in batch.head(1000).iterrows()]
+    seconds, _ = timed(lambda: [generate_payslip_html(r) for r in records], repeat=3)
+    results.add(n, "payslip_html", seconds, len(records), "slips")
+    seconds, _ = timed(lambda: [generate_payslip_pdf(r) for r in records[:100]])
+    results.add(n, "payslip_pdf", seconds, len(records[:100]), "slips")
+
+    # Attendance import into a fresh store (row count capped so the largest size stays practical)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+        written = write_attendance_csv(csv_path, itertools.islice(generate_attendance(employees, YEAR, MONTH, 1, seed), import_limit))
+        import_db = SimulatedDatabase()
+        for e in employees:
+            import_db.add_employee(e)
+        seconds, _ = timed(lambda: import_attendance_csv(csv_path, import_db))
+        results.add(n, "attendance_import_csv", seconds, written, "rows")
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {(r['size'], r['benchmark']): r for r in json.load(f)['results']}
+    regressions = []
+    for r in results:
+        old = baseline.get((r['size'], r['benchmark']))
+        if old and old['ops_per_sec'] and r['ops_per_sec'] is not None:
+            change = r['ops_per_sec'] / old['ops_per_sec'] - 1
+            if change < -tolerance:
+                regressions.append((r['size'], r['benchmark'], change))
+    for size, name, change in regressions:
+        print(f"REGRESSION {name} @ {size:,}: {change:+.1%} throughput vs baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--months", type=int, default=1, help="months of attendance per employee")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--import-limit", type=int, default=200000, help="max CSV rows in the import benchmark")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop vs baseline")
+    args = parser.parse_args(argv)
+
+    results = Results()
+    for n in args.sizes:
+        bench_size(n, args.months, results, args.import_limit, args.seed)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "months": args.months,
+            "seed": args.seed,
+        },
+        "results": results.rows,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and compare(results.rows, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
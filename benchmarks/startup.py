@@ -0,0 +1,106 @@
+"""Cold-start benchmark: import cost of the app's modules, each measured in a fresh interpreter.
+
+    python benchmarks/startup.py --repeat 5 --out startup.json
+    python benchmarks/startup.py --baseline startup.json
+
+Every target runs `setup` untimed and then times `stmt`, in a new process so nothing is
+cached. The heavy libraries that ended up imported are listed next to each timing, which
+is how a screen that accidentally pulls in ReportLab or pandas shows up.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["pandas", "pyarrow", "reportlab", "numpy", "streamlit"]
+
+APP_MODULES = ("database, sqlite_database, attendance_import, payslip_export, payslip_cache, "
+               "payroll_runner, payroll_ledger, payroll_jobs, utils")
+
+# name -> (setup, stmt)
+TARGETS = {
+    "streamlit": ("", "import streamlit"),
+    "pandas": ("", "import pandas"),
+    "reportlab": ("", "import reportlab.platypus, reportlab.lib.styles"),
+    "app_modules": ("import streamlit", f"import {APP_MODULES}"),
+    # What a session pays before the login page is interactive
+    "login_path": ("import streamlit", f"import {APP_MODULES}\n"
+                   "db = database.SimulatedDatabase()\n"
+                   "db.authenticate('bob@company.com', 'emp', 'Employee')"),
+    # First payslip render: the deferred ReportLab import lands here
+    "first_payslip_pdf": ("import utils\n"
+                          "rec = {'emp_id': 'E1', 'name': 'A', 'month': 'October-2023', 'paid_days': 30, "
+                          "'working_days': 30, 'earnings': {'Basic': 1.0}, 'deductions': {'PF': 1.0}, "
+                          "'gross_salary': 1.0, 'total_deductions': 1.0, 'net_salary': 0.0}",
+                          "utils.generate_payslip_pdf(rec)"),
+    "first_batch": ("import utils\ncalc = utils.PayrollCalculator()",
+                    "calc.calculate_batch([{'emp_id': 'E1', 'name': 'A', 'basic': 1.0, 'hra': 1.0, 'special': 1.0}], "
+                    "[], 'October', 2023)"),
+}
+
+PROBE = """
+import sys, time, json
+{setup}
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(setup, stmt):
+    code = PROBE.format(setup=setup, stmt=stmt, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per target; the best is kept")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--out", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for name in args.targets:
+        setup, stmt = TARGETS[name]
+        runs = [measure(setup, stmt) for _ in range(args.repeat)]
+        best = min(r["seconds"] for r in runs)
+        rows.append({"benchmark": name, "seconds": round(best, 6), "loaded": runs[0]["loaded"]})
+        print(f"{name:<20} {best * 1000:>9.1f} ms   loaded: {', '.join(runs[0]['loaded']) or '-'}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": rows,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["benchmark"]: r for r in json.load(f)["results"]}
+        regressions = 0
+        for r in rows:
+            old = baseline.get(r["benchmark"])
+            if old and old["seconds"] and r["seconds"] / old["seconds"] - 1 > args.tolerance:
+                print(f"REGRESSION {r['benchmark']}: {r['seconds'] / old['seconds'] - 1:+.1%} vs baseline")
+                regressions += 1
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Seeded synthetic workforce for benchmarks: N employees x M months of attendance."""
+import calendar
+import csv
+import datetime
+
+import numpy as np
+
+DEPARTMENTS = ["Engineering", "Operations", "Sales", "Finance", "Human Resources", "Support"]
+DESIGNATIONS = ["Associate", "Sr. Associate", "Lead", "Manager", "Sr. Manager"]
+IFSC_CODES = ["HDFC0000523", "ICIC0000023", "SBIN0000300", "UTIB0000009", "KKBK0000958"]
+STATES = ["Karnataka", "Maharashtra", "Tamil Nadu", "Telangana", "West Bengal", "Delhi"]
+STATUS_CHOICES = ["Present", "Half Day", "Absent", "Leave"]
+STATUS_WEIGHTS = [0.88, 0.04, 0.04, 0.04]
+
+
+def generate_employees(n, seed=42):
+    rng = np.random.default_rng(seed)
+    # Log-normal CTC centred around 8 LPA, rounded to the nearest thousand
+    ctc = np.clip(np.round(rng.lognormal(13.6, 0.5, n), -3), 200000, 10000000)
+    dept = rng.integers(0, len(DEPARTMENTS), n)
+    desig = rng.integers(0, len(DESIGNATIONS), n)
+    join_offset = rng.integers(0, 3650, n)
+    leave = rng.integers(0, 30, n)
+    state = rng.integers(0, len(STATES), n)
+    base_date = datetime.date(2015, 1, 1)
+
+    employees = []
+    for i in range(n):
+        basic = ctc[i] * 0.50
+        hra = basic * 0.20
+        employees.append({
+            "emp_id": f"E{i:06d}", "name": f"Employee {i}", "role": "Employee",
+            "email": f"e{i:06d}@company.com", "password": "emp",
+            "ctc": int(ctc[i]), "basic": basic, "hra": hra, "special": ctc[i] - basic - hra,
+            "joining_date": (base_date + datetime.timedelta(days=int(join_offset[i]))).isoformat(),
+            "department": DEPARTMENTS[dept[i]], "designation": DESIGNATIONS[desig[i]],
+            "leave_balance": int(leave[i]), "state": STATES[state[i]],
+            "bank_account": f"{5010000000000 + i}", "ifsc": IFSC_CODES[i % len(IFSC_CODES)]
+        })
+    return employees
+
+
+def generate_attendance(employees, year, month, n_months=1, seed=42):
+    """Yields (emp_id, date_str, status, check_in, check_out, ot_hours) rows, one per employee-day."""
+    rng = np.random.default_rng(seed + 1)
+    emp_ids = [e['emp_id'] for e in employees]
+    n = len(emp_ids)
+    for _ in range(n_months):
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            d = datetime.date(year, month, day)
+            d_str = d.isoformat()
+            if d.weekday() >= 5:
+                for emp_id in emp_ids:
+                    yield emp_id, d_str, "Week Off", "", "", 0
+                continue
+            status = rng.choice(len(STATUS_CHOICES), n, p=STATUS_WEIGHTS)
+            check_in = 540 + rng.integers(-20, 30, n)  # around 09:00
+            check_out = 1080 + rng.integers(-30, 90, n)  # around 18:00
+            ot = np.where(rng.random(n) < 0.1, rng.integers(1, 5, n) * 0.5, 0.0)
+            for i, emp_id in enumerate(emp_ids):
+                s = STATUS_CHOICES[status[i]]
+                if s in ("Absent", "Leave"):
+                    yield emp_id, d_str, s, "", "", 0
+                else:
+                    yield (emp_id, d_str, s, f"{check_in[i] // 60:02d}:{check_in[i] % 60:02d}",
+                           f"{check_out[i] // 60:02d}:{check_out[i] % 60:02d}", float(ot[i]))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def write_attendance_csv(path, rows):
+    """Writes rows in the sample_attendance.csv layout; returns the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["EmpID", "Date", "Status", "CheckIn", "CheckOut", "OTHours"])
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
@@ -1,200 +1,582 @@
-import streamlit as st
 import datetime
-import pandas as pd
+import heapq
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+from attendance_store import AttendanceStore, to_period
+from instrumentation import instrument_methods
+from lazy_imports import lazy_import
+from records import Employee, Request, Case, Announcement, LeaveEntry
+from search_index import InvertedIndex
+from utils import split_ctc
 
+# Only snapshots use Arrow
+pa = lazy_import("pyarrow")
+
+# Employee fields the directory may be sorted by; credentials and bank details are left out
+SORTABLE_EMPLOYEE_FIELDS = ("emp_id", "name", "role", "email", "ctc", "basic", "hra", "special",
+                            "joining_date", "department", "designation", "leave_balance", "state")
+
+# Demo data used to seed a fresh store
+SEED_EMPLOYEES = [
+    {
+        "emp_id": "EMP001", "name": "Alice Johnson", "role": "HR", "email": "alice@company.com", 
+        "password": "hr", "ctc": 1200000, "basic": 600000, "hra": 240000, "special": 360000,
+        "joining_date": "2023-01-01", "department": "Human Resources", "designation": "Sr. Manager",
+        "leave_balance": 18, "state": "Karnataka",
+        "bank_account": "50100012345671", "ifsc": "HDFC0000523"
+    },
+    {
+        "emp_id": "EMP002", "name": "Bob Smith", "role": "Employee", "email": "bob@company.com", 
+        "password": "emp", "ctc": 800000, "basic": 400000, "hra": 160000, "special": 240000,
+        "joining_date": "2023-03-15", "department": "Engineering", "designation": "Backend Developer",
+        "leave_balance": 12, "state": "Karnataka",
+        "bank_account": "918010045678123", "ifsc": "UTIB0000009"
+    },
+    {
+        "emp_id": "EMP003", "name": "Charlie Brown", "role": "Employee", "email": "charlie@company.com", 
+        "password": "emp", "ctc": 500000, "basic": 250000, "hra": 100000, "special": 150000,
+        "joining_date": "2023-06-10", "department": "Operations", "designation": "Ops Associate",
+        "leave_balance": 10, "state": "Maharashtra",
+        "bank_account": "37261548901", "ifsc": "SBIN0000300"
+    },
+    {
+        "emp_id": "EMP004", "name": "Diana Prince", "role": "Employee", "email": "diana@company.com", 
+        "password": "emp", "ctc": 1500000, "basic": 750000, "hra": 300000, "special": 450000,
+        "joining_date": "2022-11-20", "department": "Engineering", "designation": "Tech Lead",
+        "leave_balance": 22, "state": "Karnataka",
+        "bank_account": "002301567890", "ifsc": "ICIC0000023"
+    }
+]
+
+SEED_ANNOUNCEMENTS = [
+    {"date": "2023-10-01", "title": "Diwali Bonus", "message": "All employees will receive their Diwali bonus in the Oct payroll."},
+    {"date": "2023-09-15", "title": "New IT Policy", "message": "Please review the updated IT usage policy on the intranet."}
+]
+
+# Request types that draw on the leave balance when approved, and the decisions HR can make
+LEAVE_TYPES = ("Annual Leave", "Sick Leave")
+DECISIONS = ("Approved", "Rejected")
+
+
+def id_number(doc_id):
+    """Numeric suffix of a REQ-1000 / CASE-1000 style id (its place in issue order), -1 if none."""
+    _, _, number = str(doc_id).rpartition("-")
+    return int(number) if number.isdigit() else -1
+
+
+def _whole(value):
+    # Leave is counted in (half) days; keep whole numbers as ints so balances read "12", not "12.0"
+    return int(value) if float(value).is_integer() else value
+
+
+def plan_decisions(requests, status, balances):
+    """Works out a bulk approve / reject without changing anything.
+
+    requests: {req_id: request, or None when it does not exist}
+    balances: {emp_id: leave balance} of the employees whose leave requests are included
+    Requests are taken oldest first, so when an employee's balance runs out it is their
+    later requests that are refused. Returns (decided req_ids, {req_id: reason} for the
+    rest, leave ledger entries as dicts, {emp_id: new balance} for changed balances).
+    """
+    if status not in DECISIONS:
+        raise ValueError(f"Requests can only be {' or '.join(DECISIONS)}")
+    decided, skipped, entries, changed = [], {}, [], {}
+    today = datetime.date.today().strftime("%Y-%m-%d")
+    for req_id in sorted(requests, key=id_number):
+        req = requests[req_id]
+        if req is None:
+            skipped[req_id] = "not found"
+            continue
+        if req['status'] != "Pending":
+            skipped[req_id] = f"already {req['status']}"
+            continue
+        if status == "Approved" and req['type'] in LEAVE_TYPES:
+            emp_id = req['emp_id']
+            if emp_id not in balances:
+                skipped[req_id] = "employee not found"
+                continue
+            days = float(req['days'] or 1)
+            balance = float(changed.get(emp_id, balances[emp_id] or 0))
+            if balance < days:
+                skipped[req_id] = f"insufficient leave balance ({balance:g} of {days:g} days)"
+                continue
+            changed[emp_id] = _whole(balance - days)
+            entries.append({"emp_id": emp_id, "req_id": req_id, "days": _whole(-days), "balance": changed[emp_id],
+                            "reason": f"{req['type']} approved", "date": today})
+        decided.append(req_id)
+    return decided, skipped, entries, changed
+
+
+def seed_attendance(employees, days=7):
+    """Yields (emp_id, date_str, log) for the last `days` days of demo attendance."""
+    # Helper to pre-fill some simple attendance for visual charts
+    # 1 = Present, 0 = Absent for simplicity in seeding
+    import random
+    today = datetime.date.today()
+    for emp in employees:
+        for i in range(days):
+            d = today - datetime.timedelta(days=i)
+            status = "Present" if d.weekday() < 5 else "Week Off" # Mon-Fri
+            # Randomly absent
+            if status == "Present" and random.random() < 0.1:
+                status = "Absent"
+
+            yield emp['emp_id'], d.strftime("%Y-%m-%d"), {
+                "status": status,
+                "check_in": "09:00" if status == "Present" else "",
+                "check_out": "18:00" if status == "Present" else "",
+                "ot_hours": 0
+            }
+
+@instrument_methods("db")
 class SimulatedDatabase:
-    def __init__(self):
-        # Initialize session state for data persistence if not already present
-        if 'db_employees' not in st.session_state:
-            st.session_state.db_employees = [
-                {
-                    "emp_id": "EMP001", "name": "Alice Johnson", "role": "HR", "email": "alice@company.com", 
-                    "password": "hr", "ctc": 1200000, "basic": 600000, "hra": 240000, "special": 360000,
-                    "joining_date": "2023-01-01", "department": "Human Resources", "designation": "Sr. Manager",
-                    "leave_balance": 18
-                },
-                {
-                    "emp_id": "EMP002", "name": "Bob Smith", "role": "Employee", "email": "bob@company.com", 
-                    "password": "emp", "ctc": 800000, "basic": 400000, "hra": 160000, "special": 240000,
-                    "joining_date": "2023-03-15", "department": "Engineering", "designation": "Backend Developer",
-                    "leave_balance": 12
-                },
-                {
-                    "emp_id": "EMP003", "name": "Charlie Brown", "role": "Employee", "email": "charlie@company.com", 
-                    "password": "emp", "ctc": 500000, "basic": 250000, "hra": 100000, "special": 150000,
-                    "joining_date": "2023-06-10", "department": "Operations", "designation": "Ops Associate",
-                    "leave_balance": 10
-                },
-                {
-                    "emp_id": "EMP004", "name": "Diana Prince", "role": "Employee", "email": "diana@company.com", 
-                    "password": "emp", "ctc": 1500000, "basic": 750000, "hra": 300000, "special": 450000,
-                    "joining_date": "2022-11-20", "department": "Engineering", "designation": "Tech Lead",
-                    "leave_balance": 22
-                }
-            ]
-        
-        if 'db_attendance' not in st.session_state:
-            st.session_state.db_attendance = {}
-            # Seed some data for charts
+    """In-memory store shared by every session in the process.
+
+    Writes are serialised with a re-entrant lock; single-key reads go straight to the
+    dict indexes, which are safe to read while another thread writes.
+    """
+
+    def __init__(self, snapshot_dir=None):
+        self._lock = threading.RLock()
+        # Records are __slots__ classes (records.py) that keep dict-style access
+        self._employees = [Employee(e) for e in SEED_EMPLOYEES]
+
+        # Month-partitioned columnar store, see attendance_store.py
+        self._attendance = AttendanceStore()
+
+        self._payroll_history = []
+
+        # Leave, OT, Early Exit requests
+        self._requests = []
+
+        # Support cases
+        self._cases = []
+
+        # Every change to a leave balance, in order (see decide_requests)
+        self._leave_ledger = []
+
+        self._announcements = [Announcement(a) for a in SEED_ANNOUNCEMENTS]
+
+        if snapshot_dir:
+            self._load_snapshot(snapshot_dir)
+
+        # Hash indexes so lookups don't scan the lists
+        self._build_indexes()
+
+        # Append-only (emp_id, period) log; a position in it is a change sequence number.
+        # period is yyyymm for attendance edits and None for master data (affects every month)
+        self._change_log = []
+
+        # Seed some data for charts
+        if not snapshot_dir:
             self._seed_attendance()
-        
-        if 'db_payroll_history' not in st.session_state:
-            st.session_state.db_payroll_history = []
-
-        if 'db_requests' not in st.session_state:
-            # Leave, OT, Early Exit requests
-            st.session_state.db_requests = []
-
-        if 'db_cases' not in st.session_state:
-            # Support cases
-            st.session_state.db_cases = []
-            
-        if 'db_announcements' not in st.session_state:
-            st.session_state.db_announcements = [
-                {"date": "2023-10-01", "title": "Diwali Bonus", "message": "All employees will receive their Diwali bonus in the Oct payroll."},
-                {"date": "2023-09-15", "title": "New IT Policy", "message": "Please review the updated IT usage policy on the intranet."}
-            ]
+
+    def save_snapshot(self, path):
+        """Writes the whole store to path; SimulatedDatabase(snapshot_dir=path) loads it back.
+
+        Attendance goes out as raw .npy partitions and the employee master as an Arrow IPC
+        file, so loading maps both instead of parsing them.
+
+        The snapshot is written to a fresh directory that then takes path's place. This store
+        may be mapped from path itself, and writing over those files would rewrite the very
+        pages it is reading; the replaced files stay mapped until the store lets go of them.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=".snapshot-", dir=os.path.dirname(path))
+            self._write_snapshot(staging)
+            old = None
+            if os.path.exists(path):
+                old = staging + "-old"
+                os.rename(path, old)
+            os.rename(staging, path)
+            if old:
+                shutil.rmtree(old)
+
+    def _write_snapshot(self, path):
+        self._attendance.save(os.path.join(path, "attendance"))
+        table = pa.table({f: [getattr(e, f) for e in self._employees] for f in Employee.__slots__})
+        with pa.OSFile(os.path.join(path, "employees.arrow"), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        with open(os.path.join(path, "state.json"), "w") as f:
+            json.dump({"requests": [r.to_dict() for r in self._requests],
+                       "cases": [c.to_dict() for c in self._cases],
+                       "announcements": [a.to_dict() for a in self._announcements],
+                       "leave_ledger": [e.to_dict() for e in self._leave_ledger],
+                       "payroll_history": self._payroll_history}, f, default=str)
+
+    def _load_snapshot(self, path):
+        self._attendance = AttendanceStore.load(os.path.join(path, "attendance"))
+        table = pa.ipc.open_file(pa.memory_map(os.path.join(path, "employees.arrow"))).read_all()
+        columns = [table.column(f).to_pylist() if f in table.column_names else [None] * len(table)
+                   for f in Employee.__slots__]
+        self._employees = [Employee.from_values(values) for values in zip(*columns)]
+        with open(os.path.join(path, "state.json")) as f:
+            state = json.load(f)
+        self._requests = [Request(r) for r in state["requests"]]
+        self._cases = [Case(c) for c in state["cases"]]
+        self._announcements = [Announcement(a) for a in state["announcements"]]
+        self._leave_ledger = [LeaveEntry(e) for e in state.get("leave_ledger", [])]
+        self._payroll_history = state["payroll_history"]
+
+    def _build_indexes(self):
+        self._emp_by_id = {}
+        self._emp_by_email = {}
+        self._emp_by_dept = {}
+        self._emp_by_role = {}
+        self._emp_by_desig = {}
+        # Running dashboard totals, kept current by every write (see get_dashboard_stats)
+        self._total_ctc = 0
+        for emp in self._employees:
+            self._index_employee(emp)
+
+        self._req_by_id = {}
+        self._req_by_emp = {}
+        self._req_by_status = {}
+        self._req_text = InvertedIndex()
+        for req in self._requests:
+            self._index_request(req)
+
+        self._case_by_id = {}
+        self._case_by_emp = {}
+        self._case_by_status = {}
+        self._case_text = InvertedIndex()
+        for case in self._cases:
+            self._index_case(case)
+
+        self._leave_by_emp = {}
+        for entry in self._leave_ledger:
+            self._leave_by_emp.setdefault(entry['emp_id'], []).append(entry)
+
+        # Id sequences continue after the highest id issued, so ids are never reused
+        self._req_seq = itertools.count(max((id_number(r['req_id']) for r in self._requests), default=999) + 1)
+        self._case_seq = itertools.count(max((id_number(c['case_id']) for c in self._cases), default=999) + 1)
+        self._leave_seq = itertools.count(len(self._leave_ledger) + 1)
+
+    def _index_employee(self, emp):
+        # Secondary indexes map key -> {emp_id: emp} so removals stay O(1) too
+        self._emp_by_id[emp['emp_id']] = emp
+        self._emp_by_email[emp['email']] = emp
+        self._emp_by_dept.setdefault(emp.get('department'), {})[emp['emp_id']] = emp
+        self._emp_by_role.setdefault(emp.get('role'), {})[emp['emp_id']] = emp
+        self._emp_by_desig.setdefault(emp.get('designation'), {})[emp['emp_id']] = emp
+        self._total_ctc += emp['ctc']
+
+    def _index_request(self, req):
+        self._req_by_id[req['req_id']] = req
+        self._req_by_emp.setdefault(req['emp_id'], {})[req['req_id']] = req
+        self._req_by_status.setdefault(req['status'], {})[req['req_id']] = req
+        self._req_text.add(req['req_id'], req['emp_id'], req['type'], req['details'])
+
+    def _index_case(self, case):
+        self._case_by_id[case['case_id']] = case
+        self._case_by_emp.setdefault(case['emp_id'], {})[case['case_id']] = case
+        self._case_by_status.setdefault(case['status'], {})[case['case_id']] = case
+        self._case_text.add(case['case_id'], case['category'], case['description'], case['hr_comments'])
+
+    @staticmethod
+    def _move_status(by_status, doc_id, doc, old, new):
+        by_status.get(old, {}).pop(doc_id, None)
+        by_status.setdefault(new, {})[doc_id] = doc
+
+    @staticmethod
+    def _select(by_id, filters, offset, limit, newest_first):
+        """(page, total) of the docs whose ids are in every filter (None = no filter), by age.
+
+        by_id is in creation order. Small matches are sorted by id; large ones are read off
+        by_id in order, stopping as soon as the page is full.
+        """
+        filters = sorted((f for f in filters if f is not None), key=len)
+        if not filters:
+            ids = reversed(by_id) if newest_first else iter(by_id)
+            return [by_id[i] for i in itertools.islice(ids, offset, offset + limit)], len(by_id)
+
+        matched = set(filters[0]).intersection(*filters[1:]) if len(filters) > 1 else filters[0]
+        if len(matched) < len(by_id) // 8:
+            # REQ-1000 / CASE-1000 ids are issued in order, so the numeric suffix is the age
+            ids = sorted(matched, key=id_number, reverse=newest_first)
+            return [by_id[i] for i in ids[offset:offset + limit]], len(ids)
+
+        ids = reversed(by_id) if newest_first else iter(by_id)
+        page = itertools.islice((i for i in ids if i in matched), offset, offset + limit)
+        return [by_id[i] for i in page], len(matched)
+
+    def _mark_changed(self, emp_id, period=None):
+        self._change_log.append((emp_id, period))
+
+    def get_change_seq(self):
+        return len(self._change_log)
+
+    def get_changed_employees(self, since_seq, year, month):
+        """emp_ids whose payroll inputs for year/month changed after since_seq."""
+        period = year * 100 + month
+        return {emp_id for emp_id, p in self._change_log[since_seq:] if p is None or p == period}
 
     def _seed_attendance(self):
-        # Helper to pre-fill some simple attendance for visual charts
-        # 1 = Present, 0 = Absent for simplicity in seeding
-        import random
-        today = datetime.date.today()
-        # Seed last 7 days
-        for emp in st.session_state.db_employees:
-            eid = emp['emp_id']
-            if eid not in st.session_state.db_attendance:
-                st.session_state.db_attendance[eid] = {}
-            
-            for i in range(7):
-                d = today - datetime.timedelta(days=i)
-                d_str = d.strftime("%Y-%m-%d")
-                status = "Present" if d.weekday() < 5 else "Week Off" # Mon-Fri
-                # Randomly absent
-                if status == "Present" and random.random() < 0.1:
-                    status = "Absent"
-                
-                st.session_state.db_attendance[eid][d_str] = {
-                    "status": status,
-                    "check_in": "09:00" if status == "Present" else "",
-                    "check_out": "18:00" if status == "Present" else "",
-                    "ot_hours": 0
-                }
+        self._attendance.bulk_upsert(
+            (emp_id, d_str, log['status'], log['check_in'], log['check_out'], log['ot_hours'])
+            for emp_id, d_str, log in seed_attendance(self._employees)
+        )
 
     def get_all_employees(self):
-        return st.session_state.db_employees
+        return self._employees
+
+    def get_dashboard_stats(self):
+        """Headcount, total CTC, per-department headcount and open cases, without a scan."""
+        with self._lock:
+            return {
+                "headcount": len(self._emp_by_id),
+                "total_ctc": self._total_ctc,
+                "department_counts": {dept: len(emps) for dept, emps in self._emp_by_dept.items()},
+                "open_cases": len(self._case_by_status.get('Open', {})),
+            }
+
+    def add_employee(self, emp):
+        """Adds an employee unless the emp_id exists; keys that are not Employee fields are ignored."""
+        emp = emp if isinstance(emp, Employee) else Employee(emp)
+        with self._lock:
+            if emp['emp_id'] in self._emp_by_id:
+                return False
+            self._employees.append(emp)
+            self._index_employee(emp)
+            self._mark_changed(emp['emp_id'])
+            return True
 
     def get_employee(self, emp_id):
-        for emp in st.session_state.db_employees:
-            if emp['emp_id'] == emp_id:
-                return emp
-        return None
+        return self._emp_by_id.get(emp_id)
+
+    def get_bank_details(self, emp_ids):
+        """{emp_id: (bank_account, ifsc)} for the listed employees that exist."""
+        found = (self._emp_by_id.get(e) for e in emp_ids)
+        return {emp['emp_id']: (emp['bank_account'], emp['ifsc']) for emp in found if emp is not None}
+
+    def get_employees_by_department(self, department):
+        return list(self._emp_by_dept.get(department, {}).values())
+
+    def get_employees_by_role(self, role):
+        return list(self._emp_by_role.get(role, {}).values())
+
+    def get_departments(self):
+        return sorted(d for d in self._emp_by_dept if d)
+
+    def get_designations(self):
+        return sorted(d for d in self._emp_by_desig if d)
+
+    def query_employees(self, department=None, designation=None, min_ctc=None, max_ctc=None,
+                        sort_by="emp_id", descending=False, offset=0, limit=50):
+        """One page of the employee directory: (employees, total matching).
+
+        Department and designation narrow the scan through their indexes; only the rows
+        needed for the requested page are sorted.
+        """
+        if sort_by not in SORTABLE_EMPLOYEE_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+        with self._lock:
+            if department is not None and designation is not None:
+                by_desig = self._emp_by_desig.get(designation, {})
+                rows = [e for emp_id, e in self._emp_by_dept.get(department, {}).items() if emp_id in by_desig]
+            elif department is not None:
+                rows = list(self._emp_by_dept.get(department, {}).values())
+            elif designation is not None:
+                rows = list(self._emp_by_desig.get(designation, {}).values())
+            else:
+                rows = list(self._employees)
+        if min_ctc is not None or max_ctc is not None:
+            lo = float("-inf") if min_ctc is None else min_ctc
+            hi = float("inf") if max_ctc is None else max_ctc
+            rows = [e for e in rows if e.ctc is not None and lo <= e.ctc <= hi]
+
+        def key(e):
+            # Blank values sort last in either direction
+            value = getattr(e, sort_by)
+            return (value is None) != descending, value
+
+        total = len(rows)
+        end = offset + limit
+        if end < total // 8:
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            page = pick(end, rows, key=key)[offset:]
+        else:
+            page = sorted(rows, key=key, reverse=descending)[offset:end]
+        return page, total
 
     def authenticate(self, username, password, role):
-        for emp in st.session_state.db_employees:
-            if emp['email'] == username and emp['password'] == password and emp['role'] == role:
-                return emp
+        emp = self._emp_by_email.get(username)
+        if emp and emp['password'] == password and emp['role'] == role:
+            return emp
         return None
 
     def update_ctc(self, emp_id, ctc):
         emp = self.get_employee(emp_id)
         if emp:
-            basic = ctc * 0.50
-            hra = basic * 0.20
-            special = ctc - basic - hra
-            
-            emp['ctc'] = ctc
-            emp['basic'] = basic
-            emp['hra'] = hra
-            emp['special'] = special
+            basic, hra, special = split_ctc(ctc)
+
+            with self._lock:
+                self._total_ctc += ctc - emp['ctc']
+                emp['ctc'] = ctc
+                emp['basic'] = basic
+                emp['hra'] = hra
+                emp['special'] = special
+                self._mark_changed(emp_id)
             return True
         return False
 
     def add_attendance_log(self, emp_id, date, status="Present", check_in="09:00", check_out="18:00", ot_hours=0):
-        if emp_id not in st.session_state.db_attendance:
-            st.session_state.db_attendance[emp_id] = {}
-        
-        st.session_state.db_attendance[emp_id][date] = {
-            "status": status,
-            "check_in": check_in,
-            "check_out": check_out,
-            "ot_hours": ot_hours
-        }
+        with self._lock:
+            self._attendance.upsert(emp_id, date, status, check_in, check_out, ot_hours)
+            self._mark_changed(emp_id, to_period(date))
+
+    def add_attendance_logs(self, rows):
+        # Bulk insert: rows of (emp_id, date_str, status, check_in, check_out, ot_hours)
+        rows = list(rows)
+        with self._lock:
+            self._attendance.bulk_upsert(rows)
+            for emp_id, period in {(r[0], to_period(r[1])) for r in rows}:
+                self._mark_changed(emp_id, period)
+
+    def get_daily_attendance(self, start, end):
+        # Per-day status counts for [start, end], maintained by the attendance store on upsert
+        with self._lock:
+            return self._attendance.get_daily_counts(start, end)
 
     def get_attendance(self, emp_id, date_obj):
-        date_str = date_obj.strftime("%Y-%m-%d") if hasattr(date_obj, 'strftime') else str(date_obj)
-        if emp_id in st.session_state.db_attendance:
-            return st.session_state.db_attendance[emp_id].get(date_str, None)
-        return None
+        return self._attendance.get(emp_id, date_obj)
     
     def get_employee_attendance(self, emp_id):
-        return st.session_state.db_attendance.get(emp_id, {})
-
-    def submit_request(self, emp_id, req_type, details):
-        req_id = f"REQ-{len(st.session_state.db_requests) + 1000}"
-        st.session_state.db_requests.append({
-            "req_id": req_id,
-            "emp_id": emp_id,
-            "type": req_type,
-            "details": details,
-            "status": "Pending",
-            "date": datetime.date.today().strftime("%Y-%m-%d")
-        })
+        # Scans span partitions, which writers may add or grow, so they take the lock too
+        with self._lock:
+            return self._attendance.get_employee_logs(emp_id)
+
+    def get_attendance_range(self, emp_ids, start, end):
+        # Columnar logs for [start, end]; emp_ids=None means everyone
+        with self._lock:
+            return self._attendance.get_range(emp_ids, start, end)
+
+    def submit_request(self, emp_id, req_type, details, days=None):
+        """Files a Pending request; days is the leave it draws on (1 for leave types by default)."""
+        with self._lock:
+            req_id = f"REQ-{next(self._req_seq)}"
+            req = Request(
+                req_id=req_id,
+                emp_id=emp_id,
+                type=req_type,
+                details=details,
+                status="Pending",
+                date=datetime.date.today().strftime("%Y-%m-%d"),
+                days=days if days is not None else (1 if req_type in LEAVE_TYPES else None)
+            )
+            self._requests.append(req)
+            self._index_request(req)
         return req_id
 
     def get_employee_requests(self, emp_id):
-        return [r for r in st.session_state.db_requests if r['emp_id'] == emp_id]
+        return list(self._req_by_emp.get(emp_id, {}).values())
+
+    def search_requests(self, query=None, status=None, emp_id=None, offset=0, limit=20, newest_first=True):
+        """One page of requests matching the words of query (emp_id, type and details) and the filters: (requests, total)."""
+        with self._lock:
+            return self._select(self._req_by_id, [
+                self._req_by_status.get(status, {}) if status else None,
+                self._req_by_emp.get(emp_id, {}) if emp_id else None,
+                self._req_text.search(query),
+            ], offset, limit, newest_first)
 
     def get_all_requests(self):
-        return st.session_state.db_requests
+        return self._requests
 
     def update_request_status(self, req_id, status):
-        for req in st.session_state.db_requests:
-            if req['req_id'] == req_id:
+        """Approves or rejects one pending request; False if it was not decided."""
+        return req_id in self.decide_requests([req_id], status)["decided"]
+
+    def decide_requests(self, req_ids, status):
+        """Approves or rejects many pending requests in one step.
+
+        Approved leave requests draw their days from the employee's leave balance, oldest
+        request first, and add a leave ledger entry. Requests that are missing, no longer
+        pending or over balance are skipped and the rest are still decided, so a batch can be
+        partly applied. Returns {"decided": [req_id, ...], "skipped": {req_id: reason}}.
+        """
+        with self._lock:
+            requests = {req_id: self._req_by_id.get(req_id) for req_id in req_ids}
+            balances = {req['emp_id']: self._emp_by_id[req['emp_id']]['leave_balance'] for req in requests.values()
+                        if req is not None and req['emp_id'] in self._emp_by_id}
+            decided, skipped, entries, changed = plan_decisions(requests, status, balances)
+            for req_id in decided:
+                req = self._req_by_id[req_id]
+                self._move_status(self._req_by_status, req_id, req, req['status'], status)
                 req['status'] = status
-                # Decrease leave balance if approved
-                if status == "Approved":
-                    # Find emp and type
-                    # For demo purposes we just assume leave subtracts
-                    # We'd need to lookup request type and emp_id
-                    pass 
-                return True
-        return False
+            for emp_id, balance in changed.items():
+                self._emp_by_id[emp_id]['leave_balance'] = balance
+            for entry in entries:
+                entry = LeaveEntry(entry, entry_id=next(self._leave_seq))
+                self._leave_ledger.append(entry)
+                self._leave_by_emp.setdefault(entry['emp_id'], []).append(entry)
+        return {"decided": decided, "skipped": skipped}
+
+    def get_leave_ledger(self, emp_id):
+        """Leave balance movements of one employee, oldest first."""
+        return list(self._leave_by_emp.get(emp_id, []))
 
     def submit_case(self, emp_id, category, priority, description):
-        case_id = f"CASE-{len(st.session_state.db_cases) + 1000}"
-        st.session_state.db_cases.append({
-            "case_id": case_id,
-            "emp_id": emp_id,
-            "category": category,
-            "priority": priority,
-            "description": description,
-            "status": "Open",
-            "hr_comments": "",
-            "date": datetime.date.today().strftime("%Y-%m-%d")
-        })
+        with self._lock:
+            case_id = f"CASE-{next(self._case_seq)}"
+            case = Case(
+                case_id=case_id,
+                emp_id=emp_id,
+                category=category,
+                priority=priority,
+                description=description,
+                status="Open",
+                hr_comments="",
+                date=datetime.date.today().strftime("%Y-%m-%d")
+            )
+            self._cases.append(case)
+            self._index_case(case)
         return case_id
 
     def get_all_cases(self):
-        return st.session_state.db_cases
+        return self._cases
+
+    def get_employee_cases(self, emp_id):
+        return list(self._case_by_emp.get(emp_id, {}).values())
+
+    def search_cases(self, query=None, status=None, emp_id=None, offset=0, limit=20, newest_first=True):
+        """One page of cases matching the words of query (category, description, HR comments)
+        and the filters: (cases, total)."""
+        with self._lock:
+            return self._select(self._case_by_id, [
+                self._case_by_status.get(status, {}) if status else None,
+                self._case_by_emp.get(emp_id, {}) if emp_id else None,
+                self._case_text.search(query),
+            ], offset, limit, newest_first)
 
     def update_case(self, case_id, status, comments):
-        for case in st.session_state.db_cases:
-            if case['case_id'] == case_id:
+        case = self._case_by_id.get(case_id)
+        if case:
+            with self._lock:
+                self._move_status(self._case_by_status, case_id, case, case['status'], status)
                 case['status'] = status
                 case['hr_comments'] = comments
-                return True
+                self._case_text.add(case_id, case['category'], case['description'], comments)
+            return True
         return False
     
     def save_payroll_record(self, record):
-        st.session_state.db_payroll_history.append(record)
+        with self._lock:
+            self._payroll_history.append(record)
 
     def get_announcements(self):
-        return st.session_state.db_announcements
+        return self._announcements
     
     def add_announcement(self, title, message):
-        st.session_state.db_announcements.insert(0, {
-            "date": datetime.date.today().strftime("%Y-%m-%d"),
-            "title": title,
-            "message": message
-        })
+        with self._lock:
+            self._announcements.insert(0, Announcement(
+                date=datetime.date.today().strftime("%Y-%m-%d"),
+                title=title,
+                message=message
+            ))
@@ -0,0 +1,123 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds in seconds (last bucket is open-ended)
+BUCKETS = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0]
+BUCKET_LABELS = ["<10µs", "<100µs", "<1ms", "<10ms", "<100ms", "<1s", "≥1s"]
+
+
+class Stat:
+    __slots__ = ("count", "total", "min", "max", "hist", "alloc_blocks")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.hist = [0] * (len(BUCKETS) + 1)
+        self.alloc_blocks = 0
+
+    def add(self, seconds, blocks):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds < bound:
+                self.hist[i] += 1
+                break
+        else:
+            self.hist[-1] += 1
+        self.alloc_blocks += blocks
+
+
+class Profiler:
+    """Process-wide call counts, latency histograms and allocation counts per named span.
+
+    Disabled by default (HELIX_PROFILE=1 turns it on at startup); while disabled every
+    instrumented call costs one attribute check.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, blocks=0):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = Stat()
+            stat.add(seconds, blocks)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """One dict per span, slowest total first."""
+        with self._lock:
+            rows = [{
+                "name": name,
+                "calls": s.count,
+                "total_ms": round(s.total * 1000, 3),
+                "mean_ms": round(s.total / s.count * 1000, 4),
+                "min_ms": round(s.min * 1000, 4),
+                "max_ms": round(s.max * 1000, 4),
+                "alloc_blocks": s.alloc_blocks,
+                "histogram": dict(zip(BUCKET_LABELS, s.hist)),
+            } for name, s in self._stats.items()]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def export_json(self):
+        return json.dumps({"enabled": self.enabled, "buckets": BUCKET_LABELS, "spans": self.snapshot()}, indent=2)
+
+
+PROFILER = Profiler(enabled=os.environ.get("HELIX_PROFILE") == "1")
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block under `name`."""
+    if not PROFILER.enabled:
+        yield
+        return
+    # Net allocated blocks is a cheap allocation counter that needs no tracemalloc
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILER.record(name, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.record(name, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+        return wrapper
+    return decorate
+
+
+def instrument_methods(prefix):
+    """Class decorator applying timed('<prefix>.<method>') to every public method."""
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and callable(value) and not isinstance(value, (staticmethod, classmethod, type)):
+                setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+    return decorate
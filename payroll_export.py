@@ -0,0 +1,264 @@
+import csv
+import datetime
+import itertools
+import os
+import time
+
+from instrumentation import timed
+from lazy_imports import lazy_import
+from statutory_rules import default_rules
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+FORMATS = ("neft", "journal", "parquet")
+CHUNK_ROWS = 20_000
+
+# Bulk-transfer upload layout; amounts at or above RTGS_MINIMUM go by RTGS instead of NEFT
+NEFT_COLUMNS = ["txn_type", "debit_account", "beneficiary_account", "ifsc", "beneficiary_name",
+                "amount", "value_date", "reference", "narration"]
+RTGS_MINIMUM = 200_000
+ACCOUNT_PATTERN = r"\d{9,18}"
+IFSC_PATTERN = r"[A-Z]{4}0[A-Z0-9]{6}"
+
+JOURNAL_COLUMNS = ["journal_date", "journal_ref", "account_code", "account_name", "cost_centre",
+                   "debit", "credit", "narration"]
+# Salary head -> (GL account code, account name); heads not listed post to the fallbacks
+GL_ACCOUNTS = {
+    "Basic Salary": ("5101", "Salaries - Basic"),
+    "HRA": ("5102", "Salaries - House Rent Allowance"),
+    "Special Allowance": ("5103", "Salaries - Special Allowance"),
+    "Overtime Pay": ("5104", "Overtime Wages"),
+    "PF": ("2110", "Provident Fund Payable"),
+    "ESI": ("2120", "ESI Payable"),
+    "Professional Tax": ("2130", "Professional Tax Payable"),
+    "LWF": ("2140", "Labour Welfare Fund Payable"),
+    "TDS": ("2150", "TDS Payable"),
+    "net_salary": ("2200", "Salaries Payable"),
+}
+EARNING_FALLBACK = "5190"
+DEDUCTION_FALLBACK = "2190"
+
+
+class DisbursementReport:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.paid = 0
+        self.paid_amount = 0.0
+        self.skipped = {}  # reason -> count
+        self.skipped_ids = []  # first few skipped emp_ids, for the UI
+        self.debit_total = 0.0
+        self.credit_total = 0.0
+        self.files = {}  # format -> path
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _chunks(batch, chunk_rows):
+    if hasattr(batch, 'iloc'):
+        for lo in range(0, len(batch), chunk_rows):
+            yield batch.iloc[lo:lo + chunk_rows]
+    else:
+        yield from batch
+
+
+class _NeftWriter:
+    """Bank bulk-transfer CSV: one credit per employee with valid bank details and pay due."""
+
+    def __init__(self, f, db, debit_account, value_date, period, report):
+        self.f, self.db, self.report = f, db, report
+        self.debit_account, self.value_date, self.period = debit_account, value_date, period
+        self.header = True
+        try:
+            self.period_code = datetime.datetime.strptime(period, "%B-%Y").strftime("%Y%m")
+        except ValueError:
+            self.period_code = ""
+
+    def write(self, chunk):
+        details = self.db.get_bank_details(chunk['emp_id'].tolist())
+        bank = pd.DataFrame.from_dict(details, orient='index', columns=['account', 'ifsc'])
+        bank = bank.reindex(chunk['emp_id'].to_numpy())
+        account = bank['account'].fillna("").astype(str).str.replace(" ", "").to_numpy()
+        ifsc = bank['ifsc'].fillna("").astype(str).str.strip().str.upper().to_numpy()
+        amount = chunk['net_salary'].to_numpy(dtype=float).round(2)
+
+        reasons = pd.Series(None, index=chunk.index, dtype=object)
+        reasons[amount <= 0] = "no pay due"
+        reasons[~pd.Series(ifsc, index=chunk.index).str.fullmatch(IFSC_PATTERN)] = "invalid IFSC"
+        reasons[~pd.Series(account, index=chunk.index).str.fullmatch(ACCOUNT_PATTERN)] = "invalid bank account"
+        reasons[account == ""] = "missing bank details"
+        ok = reasons.isna().to_numpy()
+        for reason, count in reasons.value_counts().items():
+            self.report.skipped[reason] = self.report.skipped.get(reason, 0) + int(count)
+        if len(self.report.skipped_ids) < 50:
+            self.report.skipped_ids += chunk['emp_id'][~ok].tolist()[:50 - len(self.report.skipped_ids)]
+
+        emp_ids = chunk['emp_id'][ok]
+        lines = pd.DataFrame({
+            "txn_type": pd.Series(amount[ok] >= RTGS_MINIMUM).map({True: "RTGS", False: "NEFT"}).to_numpy(),
+            "debit_account": self.debit_account,
+            "beneficiary_account": account[ok],
+            "ifsc": ifsc[ok],
+            # Banks accept letters, digits, spaces and dots in beneficiary names, up to 35 characters
+            "beneficiary_name": chunk['name'][ok].fillna("").str.replace(r"[^A-Za-z0-9 .]", "", regex=True).str.slice(0, 35).to_numpy(),
+            "amount": amount[ok],
+            "value_date": self.value_date,
+            "reference": ("SAL" + self.period_code + emp_ids).str.slice(0, 20).to_numpy(),
+            "narration": f"Salary {self.period}",
+        }, columns=NEFT_COLUMNS)
+        lines.to_csv(self.f, header=self.header, index=False, float_format="%.2f")
+        self.header = False
+        self.report.paid += len(lines)
+        self.report.paid_amount += float(amount[ok].sum())
+
+    def close(self):
+        if self.header:
+            pd.DataFrame(columns=NEFT_COLUMNS).to_csv(self.f, index=False)
+
+
+class _JournalWriter:
+    """General-ledger journal: salary heads summed per department, written once at the end.
+
+    Earnings are debits and deductions credits; the Salaries Payable credit is what is left
+    of the rounded debits, so every cost centre balances to the paisa.
+    """
+
+    def __init__(self, f, rules, value_date, period, report):
+        self.f, self.value_date, self.period, self.report = f, value_date, period, report
+        self.earnings, self.deductions = rules.earning_heads, rules.deduction_heads
+        self.totals = None
+
+    def write(self, chunk):
+        heads = [h for h in self.earnings + self.deductions if h in chunk]
+        sums = chunk.groupby(chunk['department'].fillna('General'), sort=False)[heads].sum()
+        self.totals = sums if self.totals is None else self.totals.add(sums, fill_value=0.0)
+
+    def close(self):
+        writer = csv.writer(self.f)
+        writer.writerow(JOURNAL_COLUMNS)
+        if self.totals is None:
+            return
+        ref = f"PAYROLL-{self.period}"
+
+        def post(head, fallback, centre, debit, credit):
+            code, name = GL_ACCOUNTS.get(head, (fallback, head))
+            writer.writerow([self.value_date, ref, code, name, centre,
+                             f"{debit:.2f}" if debit else "", f"{credit:.2f}" if credit else "",
+                             f"{name} for {self.period}"])
+
+        for centre, row in self.totals.round(2).sort_index().iterrows():
+            debits = credits = 0.0
+            for head in self.earnings:
+                if row.get(head, 0.0):
+                    post(head, EARNING_FALLBACK, centre, row[head], 0.0)
+                    debits += row[head]
+            for head in self.deductions:
+                if row.get(head, 0.0):
+                    post(head, DEDUCTION_FALLBACK, centre, 0.0, row[head])
+                    credits += row[head]
+            payable = round(debits - credits, 2)
+            post("net_salary", DEDUCTION_FALLBACK, centre, 0.0, payable)
+            self.report.debit_total += debits
+            self.report.credit_total += credits + payable
+
+
+class _ParquetWriter:
+    """Archive copy of the batch, one row group per chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk):
+        if self.writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        else:
+            table = pa.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+@timed("export.export_disbursement")
+def export_disbursement(batch, dest_dir, db, formats=FORMATS, debit_account=None, value_date=None,
+                        rules=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """Writes bank-transfer, GL journal and Parquet files for a payroll batch in one pass.
+
+    batch: calculate_batch() DataFrame, or an iterable of DataFrame chunks in that layout
+    db: source of employee bank details (get_bank_details)
+    formats: any of "neft", "journal", "parquet"
+    debit_account: company account the transfers are drawn on (default: HELIX_DEBIT_ACCOUNT);
+    required with "neft"
+    value_date: payment date (default: today)
+    progress: optional callback(report) invoked after each chunk
+
+    Every chunk goes to all requested writers before the next is taken, so memory stays
+    flat however large the batch is. Files appear under their final names only once complete.
+    Employees without valid bank details are left out of the transfer file and counted in
+    report.skipped.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+    if debit_account is None:
+        debit_account = os.environ.get("HELIX_DEBIT_ACCOUNT", "")
+    debit_account = debit_account.strip()
+    if "neft" in formats and not debit_account:
+        raise ValueError("A debit account is required for the bank transfer file")
+    value_date = (value_date or datetime.date.today()).isoformat()
+    report = DisbursementReport(len(batch) if hasattr(batch, '__len__') else None)
+    os.makedirs(dest_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    chunks = _chunks(batch, chunk_rows)
+    first = next(chunks, None)
+    period = str(first['month'].iloc[0]) if first is not None and len(first) else "batch"
+    paths = {"neft": f"NEFT_{period}.csv", "journal": f"Journal_{period}.csv", "parquet": f"Payroll_{period}.parquet"}
+    paths = {fmt: os.path.join(dest_dir, paths[fmt]) for fmt in FORMATS if fmt in formats}
+
+    files, writers = [], []
+    try:
+        if "neft" in paths:
+            files.append(open(paths["neft"] + ".tmp", "w", newline=""))
+            writers.append(_NeftWriter(files[-1], db, debit_account, value_date, period, report))
+        if "journal" in paths:
+            files.append(open(paths["journal"] + ".tmp", "w", newline=""))
+            writers.append(_JournalWriter(files[-1], rules or default_rules(), value_date, period, report))
+        if "parquet" in paths:
+            writers.append(_ParquetWriter(paths["parquet"] + ".tmp"))
+
+        if first is not None:
+            for chunk in itertools.chain([first], chunks):
+                for writer in writers:
+                    writer.write(chunk)
+                report.done += len(chunk)
+                report.elapsed = time.perf_counter() - start
+                if progress:
+                    progress(report)
+        for writer in writers:
+            writer.close()
+    except BaseException:
+        for f in files:
+            f.close()
+        for path in paths.values():
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+        raise
+    for f in files:
+        f.close()
+
+    for fmt, path in paths.items():
+        os.replace(path + ".tmp", path)
+        report.files[fmt] = path
+        report.bytes_written += os.path.getsize(path)
+    report.elapsed = time.perf_counter() - start
+    return report
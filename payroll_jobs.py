@@ -0,0 +1,189 @@
+import datetime
+import itertools
+import json
+import os
+import queue
+import threading
+
+from instrumentation import instrument_methods
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "Queued", "Running", "Completed", "Failed", "Cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class PayrollJob:
+    FIELDS = ("job_id", "month", "year", "full", "status", "done", "total", "recomputed",
+              "error", "submitted_at", "started_at", "finished_at")
+
+    def __init__(self, job_id, month, year, full=False):
+        self.job_id = job_id
+        self.month = month
+        self.year = int(year)
+        self.full = full
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.recomputed = None
+        self.error = None
+        self.submitted_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.cancel_requested = threading.Event()
+
+    @property
+    def progress(self):
+        if self.status == COMPLETED:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['job_id'], data['month'], data['year'], data.get('full', False))
+        for f in cls.FIELDS:
+            setattr(job, f, data.get(f))
+        return job
+
+
+@instrument_methods("payroll_jobs")
+class PayrollJobQueue:
+    """Runs payroll batches on background worker threads.
+
+    submit() returns at once with a PayrollJob whose status, progress and result can be
+    polled from any session. Queued jobs can be cancelled outright; running ones stop at
+    the next chunk boundary. With store_dir set, every status change and each finished
+    batch are written to disk, so job history and results survive a restart; only the most
+    recently completed or read result is then held in memory, and get_result() reads older
+    ones back from disk. Without store_dir every result stays in memory.
+    """
+
+    def __init__(self, runner, workers=1, store_dir=None):
+        self.runner = runner
+        self.store_dir = store_dir
+        self._jobs = {}
+        self._cached = None  # job_id whose result is held in memory
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+            self._load()
+        start = max((int(j.split("-")[1]) for j in self._jobs), default=1000) + 1
+        self._ids = itertools.count(start)
+        for _ in range(workers):
+            threading.Thread(target=self._work, daemon=True, name="payroll-job-worker").start()
+
+    def _path(self, job_id, ext):
+        return os.path.join(self.store_dir, f"{job_id}.{ext}")
+
+    def _load(self):
+        for name in sorted(os.listdir(self.store_dir)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.store_dir, name)) as f:
+                job = PayrollJob.from_dict(json.load(f))
+            if not job.finished:
+                # The process that was running it is gone
+                job.status, job.error = FAILED, "Interrupted by restart"
+                self._save(job)
+            self._jobs[job.job_id] = job
+
+    def _save(self, job):
+        if not self.store_dir:
+            return
+        tmp = self._path(job.job_id, "json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp, self._path(job.job_id, "json"))
+
+    def submit(self, month, year, full=False):
+        with self._lock:
+            job = PayrollJob(f"JOB-{next(self._ids)}", month, year, full)
+            self._jobs[job.job_id] = job
+        self._save(job)
+        self._queue.put(job.job_id)
+        return job
+
+    def get_job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """All jobs, newest first."""
+        return sorted(self._jobs.values(), key=lambda j: int(j.job_id.split("-")[1]), reverse=True)
+
+    def get_result(self, job_id):
+        """Batch DataFrame of a completed job, read back from disk after a restart."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status != COMPLETED:
+            return None
+        result = job.result
+        if result is None and self.store_dir and os.path.exists(self._path(job_id, "pkl")):
+            result = pd.read_pickle(self._path(job_id, "pkl"))
+            self._keep_result(job, result)
+        return result
+
+    def _keep_result(self, job, result):
+        # With a store the others are on disk, so one in memory serves the page that shows it
+        with self._lock:
+            previous = self._jobs.get(self._cached)
+            if self.store_dir and previous is not None and previous is not job:
+                previous.result = None
+            job.result, self._cached = result, job.job_id
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_requested.set()
+        with self._lock:
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        return True
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self._save(job)
+
+    def _work(self):
+        while True:
+            job = self._jobs[self._queue.get()]
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+            self._save(job)
+
+            def progress(done, total):
+                if job.cancel_requested.is_set():
+                    raise JobCancelled()
+                job.done, job.total = done, total
+
+            try:
+                batch, recomputed = self.runner.run(job.month, job.year, full=job.full, progress=progress)
+            except JobCancelled:
+                self._finish(job, CANCELLED)
+                continue
+            except Exception as e:
+                self._finish(job, FAILED, f"{type(e).__name__}: {e}")
+                continue
+            job.recomputed = recomputed
+            if self.store_dir:
+                batch.to_pickle(self._path(job.job_id, "pkl"))
+            self._keep_result(job, batch)
+            self._finish(job, COMPLETED)
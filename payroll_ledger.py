@@ -0,0 +1,143 @@
+import datetime
+import json
+import os
+import threading
+
+from instrumentation import instrument_methods
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+
+MANIFEST = "_manifest.jsonl"
+
+
+@instrument_methods("ledger")
+class PayrollLedger:
+    """Append-only history of finalized payroll batches, one Arrow IPC file per month version.
+
+    Files live under root/period=yyyymm/v0001.arrow and are never rewritten: finalizing a
+    month again adds the next version, and readers see the latest one unless asked for
+    another. _manifest.jsonl records every version with its row count and totals, so month
+    summaries need no file reads at all.
+
+    Files are memory-mapped rather than loaded, and rows are sorted by emp_id, so finding
+    one employee's row in a month is a binary search over the mapped emp_id column.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.RLock()
+        self._versions = {}  # period -> [manifest entry, ...] in version order
+        self._tables = {}  # relative path -> memory-mapped pa.Table
+        self._read = 0  # bytes of the manifest already loaded
+        os.makedirs(root, exist_ok=True)
+        self._refresh()
+
+    def _refresh(self):
+        """Loads manifest lines appended since the last call, by this or another ledger."""
+        with self._lock:
+            path = os.path.join(self.root, MANIFEST)
+            if not os.path.exists(path) or os.path.getsize(path) == self._read:
+                return
+            with open(path, "rb") as f:
+                f.seek(self._read)
+                data = f.read()
+            # A line still being written by another process is left for the next call
+            data = data[:data.rfind(b"\n") + 1]
+            self._read += len(data)
+            for line in data.decode().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    entries = self._versions.setdefault(entry['period'], [])
+                    entries.append(entry)
+                    entries.sort(key=lambda e: e['version'])
+
+    def _table(self, entry):
+        table = self._tables.get(entry['path'])
+        if table is None:
+            source = pa.memory_map(os.path.join(self.root, entry['path']))
+            table = self._tables[entry['path']] = pa.ipc.open_file(source).read_all()
+        return table
+
+    def finalize(self, batch, year, month):
+        """Appends batch (calculate_batch() layout) as the next version of year/month."""
+        period = int(year) * 100 + int(month)
+        table = pa.Table.from_pandas(batch.sort_values('emp_id'), preserve_index=False).combine_chunks()
+        with self._lock:
+            folder = os.path.join(self.root, f"period={period}")
+            os.makedirs(folder, exist_ok=True)
+            # Versions are numbered from the files on disk and claimed with an exclusive
+            # create, so ledgers in other processes never write the same version
+            taken = [int(name[1:5]) for name in os.listdir(folder) if name.endswith(".arrow")]
+            version = max(taken, default=0) + 1
+            while True:
+                rel = os.path.join(f"period={period}", f"v{version:04d}.arrow")
+                try:
+                    sink = open(os.path.join(self.root, rel), "xb")
+                    break
+                except FileExistsError:
+                    version += 1
+            # The manifest line is written last, so readers never see a half-written file
+            with sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            entry = {
+                "period": period,
+                "version": version,
+                "path": rel,
+                "month": str(batch['month'].iloc[0]) if len(batch) else f"{int(year)}-{int(month):02d}",
+                "rows": len(batch),
+                "gross_salary": round(float(batch['gross_salary'].sum()), 2),
+                "total_deductions": round(float(batch['total_deductions'].sum()), 2),
+                "net_salary": round(float(batch['net_salary'].sum()), 2),
+                "finalized_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+            with open(os.path.join(self.root, MANIFEST), "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._refresh()
+        return entry
+
+    def _entry(self, year, month, version=None):
+        self._refresh()
+        entries = self._versions.get(int(year) * 100 + int(month))
+        if not entries:
+            return None
+        return entries[-1] if version is None else next((e for e in entries if e['version'] == version), None)
+
+    def get_month(self, year, month, version=None):
+        """The finalized batch for year/month (latest version by default), or None."""
+        entry = self._entry(year, month, version)
+        return self._table(entry).to_pandas() if entry else None
+
+    def get_month_totals(self, year, month, version=None):
+        """Manifest entry with row count and gross / deduction / net totals, or None."""
+        return self._entry(year, month, version)
+
+    def get_summaries(self):
+        """Latest version of every finalized month, newest month first."""
+        self._refresh()
+        return [self._versions[p][-1] for p in sorted(self._versions, reverse=True)]
+
+    def get_versions(self, year, month):
+        self._refresh()
+        return list(self._versions.get(int(year) * 100 + int(month), []))
+
+    def get_employee_history(self, emp_id):
+        """Every finalized payslip row of one employee, newest month first."""
+        self._refresh()
+        rows = []
+        for period in sorted(self._versions, reverse=True):
+            table = self._table(self._versions[period][-1])
+            col = table.column('emp_id')
+            lo, hi = 0, len(col)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if col[mid].as_py() < emp_id:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo < len(col) and col[lo].as_py() == emp_id:
+                rows.append(table.slice(lo, 1))
+        # Versions can differ in columns (fields added later) and types (an int64 column from
+        # a month without logs), so columns are unified rather than required to match
+        return pa.concat_tables(rows, promote_options="permissive").to_pandas() if rows else pd.DataFrame()
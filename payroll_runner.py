@@ -0,0 +1,96 @@
+import datetime
+import threading
+
+import numpy as np
+
+from attendance_store import month_bounds
+from instrumentation import instrument_methods, timed
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+@instrument_methods("payroll_runner")
+class PayrollRunner:
+    """Runs calculate_batch for a month and keeps the result for incremental re-runs.
+
+    Each stored batch remembers the database change sequence it was computed at. A re-run
+    asks the database which employees changed for that month since then and recomputes
+    only those rows. Runs are serialised, so sessions sharing a runner never compute the
+    same month twice at once.
+    """
+
+    def __init__(self, db, calc, chunk_size=5000):
+        self.db = db
+        self.calc = calc
+        self.chunk_size = chunk_size
+        self.batches = {}  # (year, month) -> (change_seq, DataFrame)
+        self._lock = threading.Lock()
+
+    def run(self, month_name, year, full=False, progress=None):
+        """Returns (batch DataFrame, number of employees recomputed).
+
+        progress: optional callback(done, total) invoked after each chunk of employees; an
+        exception raised from it abandons the run and leaves the stored batch untouched.
+        """
+        with self._lock:
+            return self._run(month_name, year, full, progress)
+
+    def _calculate(self, employees, att, month_name, year, progress):
+        if progress is None or len(employees) <= self.chunk_size:
+            batch = self.calc.calculate_batch(employees, att, month_name, year)
+            if progress:
+                progress(len(batch), len(batch))
+            return batch
+        # Group attendance rows by employee position once, so each chunk takes a slice
+        emp_ids = pd.Index([e['emp_id'] for e in employees])
+        pos = emp_ids.get_indexer(att['emp_id'])
+        order = np.argsort(pos, kind="stable")
+        sorted_pos = pos[order]
+        parts = []
+        for lo in range(0, len(employees), self.chunk_size):
+            hi = min(lo + self.chunk_size, len(employees))
+            rows = order[np.searchsorted(sorted_pos, lo):np.searchsorted(sorted_pos, hi)]
+            parts.append(self.calc.calculate_batch(employees[lo:hi], att.iloc[rows], month_name, year))
+            progress(hi, len(employees))
+        return pd.concat(parts, ignore_index=True)
+
+    def _run(self, month_name, year, full, progress):
+        year = int(year)
+        month = datetime.datetime.strptime(month_name, "%B").month
+        month_start, month_end = month_bounds(year, month)
+        # Read the sequence first so changes made while computing are picked up next time
+        seq = self.db.get_change_seq()
+
+        stored = None if full else self.batches.get((year, month))
+        if stored is None:
+            employees = self.db.get_all_employees()
+            att = self.db.get_attendance_range(None, month_start, month_end)
+            batch = self._calculate(employees, att, month_name, year, progress)
+            self.batches[(year, month)] = (seq, batch)
+            return batch, len(batch)
+
+        since, batch = stored
+        changed = sorted(self.db.get_changed_employees(since, year, month))
+        if changed:
+            employees = [e for e in (self.db.get_employee(emp_id) for emp_id in changed) if e]
+            att = self.db.get_attendance_range(changed, month_start, month_end)
+            batch = merge_batch(batch, self._calculate(employees, att, month_name, year, progress))
+        elif progress:
+            progress(0, 0)
+        self.batches[(year, month)] = (seq, batch)
+        return batch, len(changed)
+
+
+@timed("payroll_runner.merge_batch")
+def merge_batch(batch, updates):
+    """Replaces rows of batch with rows of updates (matched on emp_id); new employees are appended."""
+    pos = pd.Index(batch['emp_id']).get_indexer(updates['emp_id'])
+    found = pos >= 0
+    merged = batch.copy()
+    if found.any():
+        for j, col in enumerate(merged.columns):
+            merged.iloc[pos[found], j] = updates[col].to_numpy()[found]
+    if not found.all():
+        merged = pd.concat([merged, updates[~found]], ignore_index=True)
+    return merged
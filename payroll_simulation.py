@@ -0,0 +1,162 @@
+import calendar
+import itertools
+
+import numpy as np
+
+from attendance_store import month_bounds
+from instrumentation import instrument_methods
+from lazy_imports import lazy_import
+from records import Employee, to_frame
+from utils import PayrollCalculator, split_ctc
+
+pd = lazy_import("pandas")
+
+# Cells per (scenarios x employees) array in one pass; caps peak memory for large grids
+CELLS_PER_PASS = 2_000_000
+
+
+class Scenario:
+    """One what-if: a CTC revision and/or statutory rate overrides.
+
+    increment is a fractional raise for everyone (0.08 = 8%), department_increments
+    overrides it per department and ctc_overrides sets individual annual CTCs. The revision
+    applies from effective_from, a (year, month) pair, or to every month when None.
+    Other keyword arguments replace rule parameters, by PayrollCalculator.STATUTORY
+    shorthand (PF_RATE=0.10, TDS_SLABS=[(50000, 0.10), (100000, 0.20)]) or as
+    "<head>.<param>" (**{"Professional Tax.slabs": [(20000, 200)]}).
+    """
+
+    def __init__(self, name, increment=0.0, department_increments=None, ctc_overrides=None,
+                 effective_from=None, **rates):
+        unknown = {k for k in rates if k not in PayrollCalculator.STATUTORY and "." not in k}
+        if unknown:
+            raise ValueError(f"Unknown statutory rate(s): {', '.join(sorted(unknown))}")
+        self.name = name
+        self.increment = increment
+        self.department_increments = department_increments or {}
+        self.ctc_overrides = ctc_overrides or {}
+        self.effective_from = effective_from
+        self.rates = rates
+
+    def __repr__(self):
+        return f"Scenario({self.name!r})"
+
+
+def scenario_grid(increments=(0.0,), **rate_values):
+    """Every combination of increments and the listed statutory values, one Scenario each.
+
+        scenario_grid([0, 0.05, 0.08], PF_RATE=[0.12, 0.10], ESI_LIMIT=[21000, 25000])
+    """
+    scenarios = []
+    for increment, *values in itertools.product(increments, *rate_values.values()):
+        rates = dict(zip(rate_values, values))
+        name = ", ".join([f"CTC {increment:+.1%}"] + [f"{k}={v}" for k, v in rates.items()])
+        scenarios.append(Scenario(name, increment, **rates))
+    return scenarios
+
+
+@instrument_methods("payroll_simulation")
+class PayrollSimulator:
+    """Prices what-if scenarios against the live workforce without changing it.
+
+    Each month is costed with PayrollCalculator.salary_heads over (scenarios x employees)
+    arrays, so a grid of fifty scenarios is one vectorised pass per month rather than fifty
+    payroll runs. Only totals per scenario, month and group are kept.
+    """
+
+    def __init__(self, db, calc=None):
+        self.db = db
+        self.calc = calc or PayrollCalculator()
+
+    def simulate(self, scenarios, months, working_days=30, by=None):
+        """Cost-impact table with one row per scenario, month and (optionally) `by` group.
+
+        months: (year, month) pairs. Months with attendance logs are paid on them; months
+        without assume full attendance, as a payroll run does. A "Current" baseline with
+        today's CTCs and rates comes first, and the *_change columns compare against it.
+        by: an employee field such as "department" to break the totals down by.
+        """
+        scenarios = [Scenario("Current")] + list(scenarios)
+        names = [s.name for s in scenarios]
+        if len(set(names)) != len(names):
+            raise ValueError("Scenario names must be unique")
+        if by is not None and by not in Employee.__slots__:
+            raise ValueError(f"Cannot group by {by!r}")
+
+        columns = ['emp_id', 'ctc', 'basic', 'hra', 'special', 'department']
+        columns += [f for f in self.calc.rules.fields + [by] if f and f not in columns]
+        emp = to_frame(self.db.get_all_employees(), columns)
+        # Grouping fields the rules read (e.g. state), shared by every scenario
+        fields = {f: emp[f].to_numpy() for f in self.calc.rules.fields if f not in ('basic', 'hra', 'special')}
+        base = {c: emp[c].to_numpy(dtype=float) for c in ('ctc', 'basic', 'hra', 'special')}
+        revised = np.vstack([self._revised_ctc(s, emp, base['ctc']) for s in scenarios])
+        effective = np.array([s.effective_from[0] * 100 + s.effective_from[1] if s.effective_from else 0
+                              for s in scenarios])
+        overrides = [s.rates for s in scenarios]
+        heads_order = self.calc.rules.heads()
+
+        if by:
+            groups, labels = pd.factorize(emp[by].fillna("Unassigned"), sort=True)
+        else:
+            groups, labels = np.zeros(len(emp), dtype=np.int64), [None]
+
+        totals = np.zeros((len(scenarios), len(months), len(labels), len(heads_order)))
+        annual_ctc = np.zeros((len(scenarios), len(months), len(labels)))
+        headcount = np.bincount(groups, minlength=len(labels))
+        step = max(1, CELLS_PER_PASS // len(scenarios))
+        for j, (year, month) in enumerate(months):
+            start, end = month_bounds(year, month)
+            att = self.db.get_attendance_range(None, start, end)
+            paid_days, ot_hours = self.calc.attendance_totals(emp['emp_id'], att, working_days)
+            applies = (effective <= year * 100 + month)[:, None]
+            for lo in range(0, len(emp), step):
+                sl = slice(lo, lo + step)
+                ctc = np.where(applies, revised[:, sl], base['ctc'][sl])
+                # Unrevised employees keep their stored split; revised ones get update_ctc's
+                changed = ctc != base['ctc'][sl]
+                chunk = {f: values[sl] for f, values in fields.items()}
+                for c, new in zip(('basic', 'hra', 'special'), split_ctc(ctc)):
+                    chunk[c] = np.where(changed, new, base[c][sl])
+                heads = self.calc.salary_heads(chunk, paid_days[sl], ot_hours[sl], working_days, overrides)
+                # One bincount over (scenario, group) cells: linear in employees, whatever
+                # the number of groups
+                cells = (np.arange(len(scenarios))[:, None] * len(labels) + groups[sl]).ravel()
+                group_sums = lambda values: np.bincount(
+                    cells, weights=np.broadcast_to(values, ctc.shape).ravel(),
+                    minlength=len(scenarios) * len(labels)).reshape(len(scenarios), len(labels))
+                for h, head in enumerate(heads_order):
+                    totals[:, j, :, h] += group_sums(heads[head])
+                annual_ctc[:, j] += group_sums(ctc)
+
+        return self._table(names, months, by, labels, headcount, annual_ctc, heads_order, totals)
+
+    def _revised_ctc(self, scenario, emp, base_ctc):
+        increment = np.full(len(emp), float(scenario.increment))
+        for dept, dept_increment in scenario.department_increments.items():
+            increment[(emp['department'] == dept).to_numpy()] = dept_increment
+        ctc = np.where(increment != 0, base_ctc * (1 + increment), base_ctc)
+        if scenario.ctc_overrides:
+            pos = pd.Index(emp['emp_id']).get_indexer(list(scenario.ctc_overrides))
+            found = pos >= 0
+            ctc[pos[found]] = np.array(list(scenario.ctc_overrides.values()), dtype=float)[found]
+        return ctc
+
+    @staticmethod
+    def _table(names, months, by, labels, headcount, annual_ctc, heads_order, totals):
+        n_s, n_m, n_g = annual_ctc.shape
+        table = pd.DataFrame({
+            "scenario": np.repeat(names, n_m * n_g),
+            "month": np.tile(np.repeat([f"{calendar.month_name[m]}-{y}" for y, m in months], n_g), n_s),
+        })
+        if by:
+            table[by] = np.tile(np.asarray(labels, dtype=object), n_s * n_m)
+        table["headcount"] = np.tile(headcount, n_s * n_m)
+        table["annual_ctc"] = annual_ctc.ravel()
+        for h, head in enumerate(heads_order):
+            table[head] = np.round(totals[..., h].ravel(), 2)
+        gross, net = totals[..., heads_order.index("gross_salary")], totals[..., heads_order.index("net_salary")]
+        table["gross_change"] = np.round((gross - gross[:1]).ravel(), 2)
+        table["net_change"] = np.round((net - net[:1]).ravel(), 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["gross_change_pct"] = np.round(np.where(gross[:1] > 0, (gross / gross[:1] - 1) * 100, 0.0).ravel(), 2)
+        return table
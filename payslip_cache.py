@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from instrumentation import instrument_methods
+from utils import PAYSLIP_TEMPLATE_VERSION
+
+
+@instrument_methods("payslip_cache")
+class PayslipCache:
+    """Content-addressed cache for rendered payslips.
+
+    Entries are keyed by a hash of the salary record, the output kind ('html' / 'pdf') and
+    PAYSLIP_TEMPLATE_VERSION, so a changed record or template simply misses. Hot entries
+    live in an in-memory LRU; with disk_dir set, rendered output is also kept on disk and
+    survives restarts.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(kind, record):
+        payload = json.dumps(record, sort_keys=True, default=str)
+        return hashlib.sha256(f"{PAYSLIP_TEMPLATE_VERSION}:{kind}:{payload}".encode()).hexdigest()
+
+    def _disk_path(self, key, kind):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.{kind}")
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, kind, record, render):
+        """Returns cached output for record, calling render(record) only on a miss.
+
+        render must return str (html) or bytes / a BytesIO (pdf).
+        """
+        key = self.key(kind, record)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.disk_dir:
+            path = self._disk_path(key, kind)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                value = data.decode("utf-8") if kind == "html" else data
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        value = render(record)
+        if hasattr(value, "getvalue"):
+            value = value.getvalue()
+        self._remember(key, value)
+        with self._lock:
+            self.misses += 1
+
+        if self.disk_dir:
+            path = self._disk_path(key, kind)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(value.encode("utf-8") if isinstance(value, str) else value)
+            os.replace(tmp, path)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from instrumentation import timed
+from utils import generate_payslip_pdf, batch_row_to_record
+
+_PAGE_COUNT = re.compile(rb"/Count (\d+)")
+
+
+class ExportReport:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.pages = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _render(record):
+    # Runs in a worker process; only the finished PDF bytes travel back
+    pdf = generate_payslip_pdf(record).getvalue()
+    match = _PAGE_COUNT.search(pdf)
+    return record['emp_id'], pdf, int(match.group(1)) if match else 1
+
+
+def _records(batch):
+    if hasattr(batch, 'iterrows'):
+        for _, row in batch.iterrows():
+            yield batch_row_to_record(row)
+    else:
+        yield from batch
+
+
+@timed("render.export_payslips_zip")
+def export_payslips_zip(batch, dest, workers=None, progress=None):
+    """Renders a PDF payslip for every batch result and streams them into a ZIP archive.
+
+    batch: calculate_batch() DataFrame or list of calculate_salary() dicts
+    dest: path or writable binary file object
+    workers: process count (default: CPU count); 1 renders in this process
+    progress: optional callback(report) invoked after each payslip is written
+
+    At most a few payslips per worker are in flight, and each PDF is written to the
+    archive as soon as it finishes, so memory does not grow with the batch size.
+    """
+    records = _records(batch)
+    report = ExportReport(len(batch))
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    # ReportLab already deflates page streams, so storing avoids compressing twice
+    with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_STORED) as zf:
+        def write(result):
+            emp_id, pdf, pages = result
+            zf.writestr(f"Payslip_{emp_id}.pdf", pdf)
+            report.done += 1
+            report.pages += pages
+            report.bytes_written += len(pdf)
+            report.elapsed = time.perf_counter() - start
+            if progress:
+                progress(report)
+
+        if workers == 1:
+            for record in records:
+                write(_render(record))
+        else:
+            # Forking a multi-threaded server (Streamlit) can copy locks other threads hold
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pending = set()
+                for record in records:
+                    if len(pending) >= workers * 4:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in finished:
+                            write(fut.result())
+                    pending.add(pool.submit(_render, record))
+                for fut in wait(pending).done:
+                    write(fut.result())
+
+    report.elapsed = time.perf_counter() - start
+    return report
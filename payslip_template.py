@@ -0,0 +1,191 @@
+import itertools
+import string
+from io import BytesIO
+
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+
+# Write PDF streams as binary instead of ASCII85: smaller payslips and less encoding work per page
+rl_config.useA85 = 0
+
+
+class PayslipTemplate:
+    """Payslip layout built once and filled per record.
+
+    Styles, table styles, column widths and the static HTML markup are created in __init__;
+    render_html / render_pdf only format the variable fields, which is what bulk runs pay for.
+    """
+
+    HTML_ROW = ("<tr><td style='padding: 8px; border: 1px solid #ddd;'>{}</td>"
+                "<td style='padding: 8px; text-align: right; border: 1px solid #ddd; color: #27ae60;'>{}</td>"
+                "<td style='padding: 8px; border: 1px solid #ddd;'>{}</td>"
+                "<td style='padding: 8px; text-align: right; border: 1px solid #ddd; color: #c0392b;'>{}</td></tr>")
+
+    HTML_PAGE = """
+    <div style="font-family: 'Helvetica', sans-serif; max-width: 800px; margin: auto; padding: 20px; border: 1px solid #ddd; background: #fff; box-shadow: 0 4px 10px rgba(0,0,0,0.05);">
+        <div style="display: flex; justify-content: space-between; align-items: center; border-bottom: 2px solid #2c3e50; padding-bottom: 15px; margin-bottom: 20px;">
+            <div>
+                <h1 style="margin: 0; color: #2c3e50; font-size: 24px;">Helix Corp.</h1>
+                <p style="margin: 5px 0 0; color: #7f8c8d; font-size: 14px;">123 Innovation Drive, Tech City</p>
+            </div>
+            <div style="text-align: right;">
+                <h2 style="margin: 0; color: #2980b9;">PAYSLIP</h2>
+                <p style="margin: 5px 0 0; color: #7f8c8d;">{month}</p>
+            </div>
+        </div>
+
+        <div style="display: flex; gap: 40px; margin-bottom: 30px;">
+            <div style="flex: 1;">
+                <p style="margin: 5px 0;"><strong>Employee ID:</strong> {emp_id}</p>
+                <p style="margin: 5px 0;"><strong>Name:</strong> {name}</p>
+                <p style="margin: 5px 0;"><strong>Department:</strong> {department}</p>
+            </div>
+            <div style="flex: 1;">
+                <p style="margin: 5px 0;"><strong>Designation:</strong> {designation}</p>
+                <p style="margin: 5px 0;"><strong>Paid Days:</strong> {paid_days}</p>
+                <p style="margin: 5px 0;"><strong>Working Days:</strong> {working_days}</p>
+            </div>
+        </div>
+
+        <table style="width: 100%; border-collapse: collapse; margin-bottom: 20px;">
+            <thead style="background-color: #f2f2f2;">
+                <tr>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #ddd;">Earnings</th>
+                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Amount</th>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #ddd;">Deductions</th>
+                    <th style="padding: 12px; text-align: right; border: 1px solid #ddd;">Amount</th>
+                </tr>
+            </thead>
+            <tbody>
+                {rows}
+            </tbody>
+            <tfoot style="background-color: #ecf0f1; font-weight: bold;">
+                <tr>
+                    <td style="padding: 12px; border: 1px solid #ddd;">Total Earnings</td>
+                    <td style="padding: 12px; text-align: right; border: 1px solid #ddd;">{gross_salary}</td>
+                    <td style="padding: 12px; border: 1px solid #ddd;">Total Deductions</td>
+                    <td style="padding: 12px; text-align: right; border: 1px solid #ddd;">{total_deductions}</td>
+                </tr>
+            </tfoot>
+        </table>
+
+        <div style="background-color: #e8f6f3; padding: 20px; text-align: center; border-radius: 8px; border: 1px solid #1abc9c;">
+            <h3 style="margin: 0; color: #16a085;">Net Payable: {net_salary}</h3>
+            <p style="margin: 5px 0 0; font-size: 12px; color: #7f8c8d;">(This is a system generated slip)</p>
+        </div>
+    </div>
+    """
+
+    def __init__(self):
+        # HTML: split the markup into static chunks once; rendering is then a single join
+        self._html_page = [(literal, field) for literal, field, _, _ in string.Formatter().parse(self.HTML_PAGE)]
+        self._html_row = self.HTML_ROW.split("{}")
+
+        styles = getSampleStyleSheet()
+
+        # Custom Styles
+        self.title_style = ParagraphStyle('Header', parent=styles['Heading1'], alignment=TA_CENTER, textColor=colors.HexColor('#2c3e50'))
+        self.sub_style = ParagraphStyle('Sub', parent=styles['Normal'], alignment=TA_CENTER, textColor=colors.grey)
+        self.net_style = ParagraphStyle('NetPay', parent=styles['Heading3'], alignment=TA_CENTER, textColor=colors.HexColor('#27ae60'), fontSize=14)
+        self.sign_style = ParagraphStyle('Sign', parent=styles['Normal'], alignment=TA_RIGHT)
+
+        self.emp_col_widths = [100, 150, 100, 150]
+        self.emp_table_style = TableStyle([
+            ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+            ('FONTSIZE', (0,0), (-1,-1), 10),
+            ('TEXTCOLOR', (0,0), (0,-1), colors.grey), # Labels
+            ('TEXTCOLOR', (2,0), (2,-1), colors.grey), # Labels
+            ('TEXTCOLOR', (1,0), (1,-1), colors.black), # Values
+            ('TEXTCOLOR', (3,0), (3,-1), colors.black), # Values
+            ('LINEBELOW', (0,0), (-1,-1), 0.5, colors.lightgrey),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+            ('TOPPADDING', (0,0), (-1,-1), 8),
+        ])
+
+        self.pay_col_widths = [160, 90, 160, 90]
+        self.pay_header = ["EARNINGS", "AMOUNT (INR)", "DEDUCTIONS", "AMOUNT (INR)"]
+        self.pay_table_style = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#2c3e50')),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('ALIGN', (1,0), (1,-1), 'RIGHT'), # Amount cols
+            ('ALIGN', (3,0), (3,-1), 'RIGHT'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0,0), (-1,0), 10),
+            ('TOPPADDING', (0,0), (-1,0), 10),
+
+            ('FONTNAME', (0,-1), (-1,-1), 'Helvetica-Bold'), # Totals row
+            ('LINEABOVE', (0,-1), (-1,-1), 1, colors.black),
+
+            # Grid
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ])
+
+    @staticmethod
+    def _line_items(data):
+        # Earnings and deductions side by side; the shorter column is padded with None
+        return itertools.zip_longest(data['earnings'].items(), data['deductions'].items())
+
+    def render_html(self, data):
+        """Generates a HTML representation of the payslip for UI preview."""
+        fmt = lambda x: f"₹{x:,.2f}"
+        r0, r1, r2, r3, r4 = self._html_row
+        rows = "".join([
+            f"{r0}{e[0] if e else ''}{r1}{fmt(e[1]) if e else ''}{r2}{d[0] if d else ''}{r3}{fmt(d[1]) if d else ''}{r4}"
+            for e, d in self._line_items(data)
+        ])
+        fields = {
+            "month": data['month'], "emp_id": data['emp_id'], "name": data['name'],
+            "department": data.get('department', ''), "designation": data.get('designation', ''),
+            "paid_days": data['paid_days'], "working_days": data['working_days'], "rows": rows,
+            "gross_salary": fmt(data['gross_salary']), "total_deductions": fmt(data['total_deductions']),
+            "net_salary": fmt(data['net_salary'])
+        }
+        return "".join([f"{literal}{fields[field]}" if field else literal for literal, field in self._html_page])
+
+    def render_pdf(self, salary_data):
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        elements = []
+
+        # Header
+        elements.append(Paragraph("HELIX CORP", self.title_style))
+        elements.append(Paragraph(f"Payslip for the period of {salary_data['month']}", self.sub_style))
+        elements.append(Spacer(1, 20))
+
+        # Employee Details Box
+        emp_data = [
+            ["Employee ID:", salary_data['emp_id'], "Designation:", salary_data.get('designation', 'N/A')],
+            ["Name:", salary_data['name'], "Department:", salary_data.get('department', 'N/A')],
+            ["Paid Days:", str(salary_data['paid_days']), "Working Days:", str(salary_data['working_days'])]
+        ]
+        t_emp = Table(emp_data, colWidths=self.emp_col_widths)
+        t_emp.setStyle(self.emp_table_style)
+        elements.append(t_emp)
+        elements.append(Spacer(1, 20))
+
+        # Earnings & Deductions Table
+        data = [self.pay_header]
+        for e, d in self._line_items(salary_data):
+            data.append([e[0] if e else "", f"{e[1]:,.2f}" if e else "",
+                         d[0] if d else "", f"{d[1]:,.2f}" if d else ""])
+        data.append(["Total Earnings", f"{salary_data['gross_salary']:,.2f}", "Total Deductions", f"{salary_data['total_deductions']:,.2f}"])
+
+        t = Table(data, colWidths=self.pay_col_widths)
+        t.setStyle(self.pay_table_style)
+        elements.append(t)
+        elements.append(Spacer(1, 30))
+
+        # Net Pay Box
+        elements.append(Paragraph(f"Net Salary Payable: INR {salary_data['net_salary']:,.2f}", self.net_style))
+
+        elements.append(Spacer(1, 40))
+        elements.append(Paragraph("Authorized Signatory", self.sign_style))
+
+        doc.build(elements)
+        buffer.seek(0)
+        return buffer
@@ -0,0 +1,101 @@
+from collections.abc import Mapping
+
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class Record(Mapping):
+    """Fixed-field record stored in __slots__ that still reads and writes like a dict.
+
+    A slotted instance has no per-object __dict__ and no copy of the key strings, so it
+    takes a fraction of the memory of the equivalent dict. record['field'],
+    record.get('field'), keys() / items(), dict(record) and **record all work as before;
+    only the fields listed in __slots__ can be set. Keys that are not fields are dropped
+    when a record is built, as the SQLite backend drops columns it has no place for.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data=None, **kwargs):
+        if data:
+            kwargs = {**data, **kwargs}
+        for field in self.__slots__:
+            setattr(self, field, kwargs.get(field))
+
+    @classmethod
+    def from_values(cls, values):
+        """Builds a record from field values in __slots__ order, skipping keyword handling."""
+        record = cls.__new__(cls)
+        for field, value in zip(cls.__slots__, values):
+            setattr(record, field, value)
+        return record
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Employee(Record):
+    __slots__ = ("emp_id", "name", "role", "email", "password", "ctc", "basic", "hra", "special",
+                 "joining_date", "department", "designation", "leave_balance", "state", "bank_account", "ifsc")
+
+
+class Request(Record):
+    __slots__ = ("req_id", "emp_id", "type", "details", "status", "date", "days")
+
+
+class LeaveEntry(Record):
+    # One signed movement of an employee's leave balance; balance is the balance after it
+    __slots__ = ("entry_id", "emp_id", "req_id", "days", "balance", "reason", "date")
+
+
+class Case(Record):
+    __slots__ = ("case_id", "emp_id", "category", "priority", "description", "status", "hr_comments", "date")
+
+
+class Announcement(Record):
+    __slots__ = ("date", "title", "message")
+
+
+class AttendanceLog(Record):
+    __slots__ = ("status", "check_in", "check_out", "ot_hours")
+
+
+def to_frame(records, columns=None):
+    """DataFrame from a list of records (or dicts), built column by column.
+
+    pandas would otherwise copy every Record into a temporary dict first.
+    """
+    if isinstance(records, pd.DataFrame):
+        return records if columns is None else records[list(columns)]
+    records = records if isinstance(records, list) else list(records)
+    if records and isinstance(records[0], Record):
+        fields = columns or records[0].__slots__
+        return pd.DataFrame({f: [getattr(r, f) for r in records] for f in fields})
+    return pd.DataFrame(records, columns=columns)
@@ -0,0 +1,76 @@
+import bisect
+import re
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def words(text):
+    """Lower-cased alphanumeric words of text, in order."""
+    return _TOKEN.findall(str(text or "").lower())
+
+
+def tokenize(text):
+    """Lower-cased alphanumeric words of text, as a set."""
+    return set(words(text))
+
+
+class InvertedIndex:
+    """token -> {doc_id} postings for small text fields, updated in place.
+
+    search() needs every query word to match; the last word also matches as a prefix, so
+    results narrow as the user types. Postings are sets, so a query costs about the size
+    of its rarest word's posting list rather than the number of documents.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_tokens = {}
+        self._vocab = None  # sorted tokens, rebuilt lazily for prefix lookups
+
+    def add(self, doc_id, *texts):
+        """Indexes doc_id under the words of texts, replacing what it was indexed under before."""
+        tokens = set().union(*map(tokenize, texts))
+        old = self._doc_tokens.get(doc_id, set())
+        for token in old - tokens:
+            postings = self._postings[token]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[token]
+                self._vocab = None
+        for token in tokens - old:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._vocab = None
+            postings.add(doc_id)
+        self._doc_tokens[doc_id] = tokens
+
+    def remove(self, doc_id):
+        self.add(doc_id)
+        del self._doc_tokens[doc_id]
+
+    def _prefix(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = set()
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query):
+        """doc_ids matching every word of query; None when the query has no words."""
+        query_words = words(query)
+        if not query_words:
+            return None
+        candidates = [self._postings.get(w, set()) for w in query_words[:-1]]
+        candidates.append(self._prefix(query_words[-1]))
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for postings in candidates[1:]:
+            if not result:
+                break
+            result &= postings
+        return result
@@ -0,0 +1,523 @@
+import datetime
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+from attendance_store import STATUS_NAMES, STATUS_CODES, check_statuses, to_date, to_period
+from instrumentation import instrument_methods
+from lazy_imports import lazy_import
+from search_index import words
+from database import (SEED_EMPLOYEES, SEED_ANNOUNCEMENTS, LEAVE_TYPES, SORTABLE_EMPLOYEE_FIELDS, plan_decisions,
+                      seed_attendance)
+from utils import split_ctc
+
+pd = lazy_import("pandas")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    emp_id TEXT PRIMARY KEY,
+    name TEXT, role TEXT, email TEXT UNIQUE, password TEXT,
+    ctc NUMERIC, basic NUMERIC, hra NUMERIC, special NUMERIC,
+    joining_date TEXT, department TEXT, designation TEXT,
+    leave_balance NUMERIC, state TEXT, bank_account TEXT, ifsc TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_employees_department ON employees (department);
+CREATE INDEX IF NOT EXISTS idx_employees_role ON employees (role);
+CREATE INDEX IF NOT EXISTS idx_employees_designation ON employees (designation);
+CREATE INDEX IF NOT EXISTS idx_employees_ctc ON employees (ctc);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    emp_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT, check_in TEXT, check_out TEXT, ot_hours NUMERIC,
+    PRIMARY KEY (emp_id, date)
+) WITHOUT ROWID;
+-- Covers the dashboard's per-day status counts without touching the table
+CREATE INDEX IF NOT EXISTS idx_attendance_date_status ON attendance (date, status);
+
+CREATE TABLE IF NOT EXISTS requests (
+    req_id TEXT PRIMARY KEY,
+    emp_id TEXT, type TEXT, details TEXT, status TEXT, date TEXT, days NUMERIC
+);
+CREATE INDEX IF NOT EXISTS idx_requests_emp ON requests (emp_id);
+CREATE INDEX IF NOT EXISTS idx_requests_status ON requests (status);
+
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    emp_id TEXT, category TEXT, priority TEXT, description TEXT,
+    status TEXT, hr_comments TEXT, date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cases_emp ON cases (emp_id);
+CREATE INDEX IF NOT EXISTS idx_cases_status ON cases (status);
+
+-- Full-text indexes over the free-text columns, kept in step by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS requests_fts USING fts5(emp_id, type, details, content='requests', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS requests_fts_insert AFTER INSERT ON requests BEGIN
+    INSERT INTO requests_fts (rowid, emp_id, type, details) VALUES (new.rowid, new.emp_id, new.type, new.details);
+END;
+CREATE TRIGGER IF NOT EXISTS requests_fts_update AFTER UPDATE OF emp_id, type, details ON requests BEGIN
+    INSERT INTO requests_fts (requests_fts, rowid, emp_id, type, details)
+    VALUES ('delete', old.rowid, old.emp_id, old.type, old.details);
+    INSERT INTO requests_fts (rowid, emp_id, type, details) VALUES (new.rowid, new.emp_id, new.type, new.details);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(category, description, hr_comments, content='cases', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS cases_fts_insert AFTER INSERT ON cases BEGIN
+    INSERT INTO cases_fts (rowid, category, description, hr_comments)
+    VALUES (new.rowid, new.category, new.description, new.hr_comments);
+END;
+CREATE TRIGGER IF NOT EXISTS cases_fts_update AFTER UPDATE OF category, description, hr_comments ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, category, description, hr_comments)
+    VALUES ('delete', old.rowid, old.category, old.description, old.hr_comments);
+    INSERT INTO cases_fts (rowid, category, description, hr_comments)
+    VALUES (new.rowid, new.category, new.description, new.hr_comments);
+END;
+
+-- Dashboard figures, kept current by triggers in the same transaction as each write;
+-- department_counts stores a NULL department as ''
+CREATE TABLE IF NOT EXISTS dashboard_counts (
+    name TEXT PRIMARY KEY,
+    value NUMERIC NOT NULL
+);
+CREATE TABLE IF NOT EXISTS department_counts (
+    department TEXT PRIMARY KEY,
+    headcount INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS employees_count_insert AFTER INSERT ON employees BEGIN
+    UPDATE dashboard_counts SET value = value + 1 WHERE name = 'headcount';
+    UPDATE dashboard_counts SET value = value + COALESCE(new.ctc, 0) WHERE name = 'total_ctc';
+    INSERT INTO department_counts (department, headcount) VALUES (IFNULL(new.department, ''), 1)
+        ON CONFLICT (department) DO UPDATE SET headcount = headcount + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS employees_count_update AFTER UPDATE OF ctc, department ON employees BEGIN
+    UPDATE dashboard_counts SET value = value + COALESCE(new.ctc, 0) - COALESCE(old.ctc, 0) WHERE name = 'total_ctc';
+    UPDATE department_counts SET headcount = headcount - 1 WHERE department = IFNULL(old.department, '');
+    INSERT INTO department_counts (department, headcount) VALUES (IFNULL(new.department, ''), 1)
+        ON CONFLICT (department) DO UPDATE SET headcount = headcount + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS employees_count_delete AFTER DELETE ON employees BEGIN
+    UPDATE dashboard_counts SET value = value - 1 WHERE name = 'headcount';
+    UPDATE dashboard_counts SET value = value - COALESCE(old.ctc, 0) WHERE name = 'total_ctc';
+    UPDATE department_counts SET headcount = headcount - 1 WHERE department = IFNULL(old.department, '');
+END;
+CREATE TRIGGER IF NOT EXISTS cases_count_insert AFTER INSERT ON cases WHEN new.status = 'Open' BEGIN
+    UPDATE dashboard_counts SET value = value + 1 WHERE name = 'open_cases';
+END;
+CREATE TRIGGER IF NOT EXISTS cases_count_update AFTER UPDATE OF status ON cases BEGIN
+    UPDATE dashboard_counts SET value = value + (IFNULL(new.status, '') = 'Open') - (IFNULL(old.status, '') = 'Open')
+    WHERE name = 'open_cases';
+END;
+CREATE TRIGGER IF NOT EXISTS cases_count_delete AFTER DELETE ON cases WHEN old.status = 'Open' BEGIN
+    UPDATE dashboard_counts SET value = value - 1 WHERE name = 'open_cases';
+END;
+
+-- Every change to a leave balance, in order
+CREATE TABLE IF NOT EXISTS leave_ledger (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id TEXT NOT NULL, req_id TEXT, days NUMERIC, balance NUMERIC, reason TEXT, date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_leave_ledger_emp ON leave_ledger (emp_id);
+
+-- Next REQ- / CASE- number; bumped inside the insert's transaction, so ids are never reused
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS payroll_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id TEXT, month TEXT, record TEXT
+);
+
+-- Append-only change log driving incremental payroll; period is yyyymm, NULL for master data
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    emp_id TEXT, period INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS announcements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT, title TEXT, message TEXT
+);
+"""
+
+REQUEST_COLUMNS = ["req_id", "emp_id", "type", "details", "status", "date", "days"]
+EMPLOYEE_COLUMNS = ["emp_id", "name", "role", "email", "password", "ctc", "basic", "hra", "special",
+                    "joining_date", "department", "designation", "leave_balance", "state",
+                    "bank_account", "ifsc"]
+
+# Statements are kept as constants so sqlite3's per-connection statement cache reuses them
+SQL_INSERT_EMPLOYEE = f"INSERT OR IGNORE INTO employees ({', '.join(EMPLOYEE_COLUMNS)}) VALUES ({', '.join('?' * len(EMPLOYEE_COLUMNS))})"
+SQL_GET_EMPLOYEE = "SELECT * FROM employees WHERE emp_id = ?"
+SQL_UPSERT_ATTENDANCE = "INSERT OR REPLACE INTO attendance (emp_id, date, status, check_in, check_out, ot_hours) VALUES (?, ?, ?, ?, ?, ?)"
+SQL_GET_ATTENDANCE = "SELECT status, check_in, check_out, ot_hours FROM attendance WHERE emp_id = ? AND date = ?"
+SQL_LOG_CHANGE = "INSERT INTO change_log (emp_id, period) VALUES (?, ?)"
+SQL_STATUS_CODE = f"CASE status {' '.join(f'WHEN {name!r} THEN {code}' for name, code in STATUS_CODES.items())} ELSE 0 END"
+
+
+def sql_minutes(column):
+    """SQL expression for an "HH:MM" column as minutes since midnight (parse_hhmm), -1 when blank."""
+    colon = f"instr({column}, ':')"
+    return (f"CASE WHEN {column} IS NULL OR {column} = '' THEN -1 ELSE "
+            f"CAST(substr({column}, 1, {colon} - 1) AS INTEGER) * 60 + CAST(substr({column}, {colon} + 1) AS INTEGER) END")
+
+
+def fts_query(query):
+    """FTS5 MATCH expression requiring every word of query, the last one as a prefix.
+
+    Words are quoted, so operators and punctuation typed into a search box are taken literally.
+    """
+    query_words = words(query)
+    if not query_words:
+        return None
+    return " ".join(f'"{w}"' for w in query_words) + "*"
+
+
+@instrument_methods("sqlite")
+class SQLiteDatabase:
+    """Same API as SimulatedDatabase, backed by one SQLite file shared by all sessions."""
+
+    def __init__(self, path="helix.db"):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            # Request search indexed only type and details before emp_id was added; such
+            # files get the index recreated and refilled below
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'requests_fts'").fetchone() and not any(
+                    r[1] == "emp_id" for r in conn.execute("PRAGMA table_info(requests_fts)")):
+                conn.executescript("DROP TRIGGER IF EXISTS requests_fts_insert; DROP TRIGGER IF EXISTS "
+                                   "requests_fts_update; DROP TABLE requests_fts;")
+            missing_fts = [t for t in ("requests_fts", "cases_fts") if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (t,)).fetchone()]
+            conn.executescript(SCHEMA)
+            # Files from before a column was added get it as NULL
+            for table, columns in (("employees", EMPLOYEE_COLUMNS), ("requests", REQUEST_COLUMNS)):
+                existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+                for column in columns:
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+            # Sequences start after the highest id already issued
+            for table, column in (("requests", "req_id"), ("cases", "case_id")):
+                conn.execute(f"INSERT OR IGNORE INTO sequences (name, value) SELECT ?, COALESCE(MAX(CAST("
+                             f"substr({column}, instr({column}, '-') + 1) AS INTEGER)), 999) FROM {table}", (table,))
+            # New files start the dashboard counts at zero; older files count their rows once
+            conn.execute("""INSERT OR IGNORE INTO dashboard_counts (name, value) VALUES
+                ('headcount', (SELECT COUNT(*) FROM employees)),
+                ('total_ctc', (SELECT COALESCE(SUM(ctc), 0) FROM employees)),
+                ('open_cases', (SELECT COUNT(*) FROM cases WHERE status = 'Open'))""")
+            if not conn.execute("SELECT 1 FROM department_counts").fetchone():
+                conn.execute("INSERT OR IGNORE INTO department_counts (department, headcount) "
+                             "SELECT IFNULL(department, ''), COUNT(*) FROM employees GROUP BY 1")
+            # Files created before the full-text tables existed get them filled once
+            for table in missing_fts:
+                conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        self._seed()
+
+    def _conn(self):
+        # One connection per worker thread; sqlite3 connections must not cross threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _seed(self):
+        conn = self._conn()
+        if conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]:
+            return
+        with conn:
+            conn.executemany(SQL_INSERT_EMPLOYEE, [[e.get(c) for c in EMPLOYEE_COLUMNS] for e in SEED_EMPLOYEES])
+            conn.executemany(SQL_UPSERT_ATTENDANCE, [
+                (emp_id, d_str, log['status'], log['check_in'], log['check_out'], log['ot_hours'])
+                for emp_id, d_str, log in seed_attendance(SEED_EMPLOYEES)
+            ])
+            conn.executemany("INSERT INTO announcements (date, title, message) VALUES (?, ?, ?)",
+                             [(a['date'], a['title'], a['message']) for a in reversed(SEED_ANNOUNCEMENTS)])
+
+    def _one(self, sql, params=()):
+        row = self._conn().execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def _all(self, sql, params=()):
+        return [dict(r) for r in self._conn().execute(sql, params)]
+
+    def _all_in(self, sql, values, conn=None):
+        """Rows of sql, whose "{}" is filled with an IN list, for any number of values.
+
+        Values go in batches that stay under SQLite's default host-parameter limit.
+        """
+        values, conn = list(values), conn or self._conn()
+        for lo in range(0, len(values), 900):
+            chunk = values[lo:lo + 900]
+            yield from conn.execute(sql.format(", ".join("?" * len(chunk))), chunk)
+
+    @staticmethod
+    def _next_id(conn, name):
+        # Called inside the inserting transaction, which holds the write lock
+        return conn.execute("UPDATE sequences SET value = value + 1 WHERE name = ? RETURNING value", (name,)).fetchone()[0]
+
+    def get_change_seq(self):
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+    def get_changed_employees(self, since_seq, year, month):
+        """emp_ids whose payroll inputs for year/month changed after since_seq."""
+        rows = self._conn().execute(
+            "SELECT DISTINCT emp_id FROM change_log WHERE seq > ? AND (period IS NULL OR period = ?)",
+            (since_seq, year * 100 + month))
+        return {r[0] for r in rows}
+
+    def get_all_employees(self):
+        return self._all("SELECT * FROM employees ORDER BY emp_id")
+
+    def get_dashboard_stats(self):
+        """Headcount, total CTC, per-department headcount and open cases, from the trigger-kept counts."""
+        conn = self._conn()
+        counts = dict(conn.execute("SELECT name, value FROM dashboard_counts").fetchall())
+        departments = conn.execute("SELECT department, headcount FROM department_counts WHERE headcount > 0")
+        return {
+            "headcount": counts["headcount"],
+            "total_ctc": counts["total_ctc"],
+            "department_counts": {dept or None: n for dept, n in departments},
+            "open_cases": counts["open_cases"],
+        }
+
+    def add_employee(self, emp):
+        """Adds an employee unless the emp_id exists; keys that are not employee columns are ignored."""
+        with self._conn() as conn:
+            cur = conn.execute(SQL_INSERT_EMPLOYEE, [emp.get(c) for c in EMPLOYEE_COLUMNS])
+            if cur.rowcount == 1:
+                conn.execute(SQL_LOG_CHANGE, (emp['emp_id'], None))
+        return cur.rowcount == 1
+
+    def get_employee(self, emp_id):
+        return self._one(SQL_GET_EMPLOYEE, (emp_id,))
+
+    def get_bank_details(self, emp_ids):
+        """{emp_id: (bank_account, ifsc)} for the listed employees that exist."""
+        rows = self._all_in("SELECT emp_id, bank_account, ifsc FROM employees WHERE emp_id IN ({})", emp_ids)
+        return {r[0]: (r[1], r[2]) for r in rows}
+
+    def get_employees_by_department(self, department):
+        return self._all("SELECT * FROM employees WHERE department = ? ORDER BY emp_id", (department,))
+
+    def get_employees_by_role(self, role):
+        return self._all("SELECT * FROM employees WHERE role = ? ORDER BY emp_id", (role,))
+
+    def get_departments(self):
+        return [r[0] for r in self._conn().execute(
+            "SELECT DISTINCT department FROM employees WHERE department IS NOT NULL ORDER BY department")]
+
+    def get_designations(self):
+        return [r[0] for r in self._conn().execute(
+            "SELECT DISTINCT designation FROM employees WHERE designation IS NOT NULL ORDER BY designation")]
+
+    def query_employees(self, department=None, designation=None, min_ctc=None, max_ctc=None,
+                        sort_by="emp_id", descending=False, offset=0, limit=50):
+        """One page of the employee directory: (employees, total matching)."""
+        if sort_by not in SORTABLE_EMPLOYEE_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+        clauses, params = [], []
+        for sql, value in (("department = ?", department), ("designation = ?", designation),
+                           ("ctc >= ?", min_ctc), ("ctc <= ?", max_ctc)):
+            if value is not None:
+                clauses.append(sql)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        total = self._conn().execute(f"SELECT COUNT(*) FROM employees{where}", params).fetchone()[0]
+        # sort_by is checked against the sortable columns above, so it is safe to interpolate
+        order = f"{sort_by} IS NULL, {sort_by} {'DESC' if descending else 'ASC'}, emp_id"
+        page = self._all(f"SELECT * FROM employees{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                         params + [limit, offset])
+        return page, total
+
+    def authenticate(self, username, password, role):
+        return self._one("SELECT * FROM employees WHERE email = ? AND password = ? AND role = ?",
+                         (username, password, role))
+
+    def update_ctc(self, emp_id, ctc):
+        basic, hra, special = split_ctc(ctc)
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE employees SET ctc = ?, basic = ?, hra = ?, special = ? WHERE emp_id = ?",
+                               (ctc, basic, hra, special, emp_id))
+            if cur.rowcount == 1:
+                conn.execute(SQL_LOG_CHANGE, (emp_id, None))
+        return cur.rowcount == 1
+
+    def add_attendance_log(self, emp_id, date, status="Present", check_in="09:00", check_out="18:00", ot_hours=0):
+        check_statuses([status])
+        date_str = date.strftime("%Y-%m-%d") if hasattr(date, 'strftime') else str(date)
+        with self._conn() as conn:
+            conn.execute(SQL_UPSERT_ATTENDANCE, (emp_id, date_str, status, check_in, check_out, ot_hours))
+            conn.execute(SQL_LOG_CHANGE, (emp_id, to_period(date_str)))
+
+    def add_attendance_logs(self, rows):
+        # Bulk insert: rows of (emp_id, date_str, status, check_in, check_out, ot_hours) in one transaction
+        rows = list(rows)
+        check_statuses({r[2] for r in rows})
+        with self._conn() as conn:
+            conn.executemany(SQL_UPSERT_ATTENDANCE, rows)
+            conn.executemany(SQL_LOG_CHANGE, {(r[0], to_period(r[1])) for r in rows})
+
+    def get_attendance(self, emp_id, date_obj):
+        date_str = date_obj.strftime("%Y-%m-%d") if hasattr(date_obj, 'strftime') else str(date_obj)
+        return self._one(SQL_GET_ATTENDANCE, (emp_id, date_str))
+
+    def get_employee_attendance(self, emp_id):
+        rows = self._conn().execute(
+            "SELECT date, status, check_in, check_out, ot_hours FROM attendance WHERE emp_id = ? ORDER BY date DESC",
+            (emp_id,))
+        return {r['date']: {"status": r['status'], "check_in": r['check_in'], "check_out": r['check_out'],
+                            "ot_hours": r['ot_hours']} for r in rows}
+
+    def get_daily_attendance(self, start, end):
+        """Same layout as AttendanceStore.get_daily_counts(), from the (date, status) index."""
+        rows = self._conn().execute(
+            "SELECT date, status, COUNT(*) FROM attendance WHERE date BETWEEN ? AND ? GROUP BY date, status",
+            (to_date(start).isoformat(), to_date(end).isoformat())).fetchall()
+        df = pd.DataFrame(rows, columns=["date", "status", "count"])
+        df["date"] = [to_date(d) for d in df["date"]]
+        counts = df.pivot_table(index="date", columns="status", values="count", aggfunc="sum", fill_value=0)
+        counts = counts.reindex(columns=STATUS_NAMES, fill_value=0).astype(np.int64)
+        counts.columns.name = None
+        return counts
+
+    def get_attendance_range(self, emp_ids, start, end):
+        """Same columnar layout as AttendanceStore.get_range(), served from the (emp_id, date) key."""
+        # Dates, statuses and "HH:MM" punches are turned into numbers by SQLite, not per row in Python
+        sql = f"""SELECT emp_id, CAST(replace(date, '-', '') AS INTEGER), {SQL_STATUS_CODE},
+                         {sql_minutes('check_in')}, {sql_minutes('check_out')}, COALESCE(ot_hours, 0)
+                  FROM attendance WHERE date BETWEEN ? AND ?"""
+        params = [to_date(start).isoformat(), to_date(end).isoformat()]
+        if emp_ids is not None:
+            emp_ids = list(emp_ids)
+            # Short lists use the (emp_id, date) key; long ones are filtered below to stay
+            # under SQLite's bound-parameter limit
+            if len(emp_ids) <= 500:
+                sql += f" AND emp_id IN ({', '.join('?' * len(emp_ids))})"
+                params += emp_ids
+        cur = self._conn().cursor()
+        cur.row_factory = None  # plain tuples; sqlite3.Row objects cost more than the query
+        rows = cur.execute(sql + " ORDER BY emp_id, date", params).fetchall()
+        emp, date, status, check_in, check_out, ot = zip(*rows) if rows else ([],) * 6
+        df = pd.DataFrame({
+            "emp_id": np.array(emp, dtype=object),
+            "date": np.array(date, dtype=np.int64),
+            "status": pd.Categorical.from_codes(np.array(status, dtype=np.int8), STATUS_NAMES),
+            "check_in": np.array(check_in, dtype=np.int16),
+            "check_out": np.array(check_out, dtype=np.int16),
+            "ot_hours": np.array(ot, dtype=np.float64),
+        })
+        if emp_ids is not None and len(emp_ids) > 500:
+            df = df[df['emp_id'].isin(set(emp_ids))].reset_index(drop=True)
+        return df
+
+    def submit_request(self, emp_id, req_type, details, days=None):
+        """Files a Pending request; days is the leave it draws on (1 for leave types by default)."""
+        if days is None and req_type in LEAVE_TYPES:
+            days = 1
+        conn = self._conn()
+        with conn:
+            # IMMEDIATE takes the write lock before the sequence is read, so concurrent sessions can't reuse an id
+            conn.execute("BEGIN IMMEDIATE")
+            req_id = f"REQ-{self._next_id(conn, 'requests')}"
+            conn.execute("INSERT INTO requests (req_id, emp_id, type, details, status, date, days) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (req_id, emp_id, req_type, details, "Pending", datetime.date.today().strftime("%Y-%m-%d"), days))
+        return req_id
+
+    def get_employee_requests(self, emp_id):
+        return self._all("SELECT * FROM requests WHERE emp_id = ? ORDER BY rowid", (emp_id,))
+
+    def search_requests(self, query=None, status=None, emp_id=None, offset=0, limit=20, newest_first=True):
+        """One page of requests matching the words of query (emp_id, type and details) and the filters: (requests, total)."""
+        return self._search("requests", query, status, emp_id, offset, limit, newest_first)
+
+    def get_all_requests(self):
+        return self._all("SELECT * FROM requests ORDER BY rowid")
+
+    def update_request_status(self, req_id, status):
+        """Approves or rejects one pending request; False if it was not decided."""
+        return req_id in self.decide_requests([req_id], status)["decided"]
+
+    def decide_requests(self, req_ids, status):
+        """Same contract as SimulatedDatabase.decide_requests, in one write transaction."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            requests = dict.fromkeys(req_ids)
+            requests.update((r["req_id"], dict(r)) for r in self._all_in("SELECT * FROM requests WHERE req_id IN ({})", list(requests), conn))
+            emp_ids = {r['emp_id'] for r in requests.values() if r is not None}
+            balances = dict(self._all_in("SELECT emp_id, leave_balance FROM employees WHERE emp_id IN ({})", emp_ids, conn))
+            decided, skipped, entries, changed = plan_decisions(requests, status, balances)
+            conn.executemany("UPDATE requests SET status = ? WHERE req_id = ?", [(status, r) for r in decided])
+            conn.executemany("UPDATE employees SET leave_balance = ? WHERE emp_id = ?", [(b, e) for e, b in changed.items()])
+            conn.executemany("INSERT INTO leave_ledger (emp_id, req_id, days, balance, reason, date) VALUES (?, ?, ?, ?, ?, ?)",
+                             [(e['emp_id'], e['req_id'], e['days'], e['balance'], e['reason'], e['date']) for e in entries])
+        return {"decided": decided, "skipped": skipped}
+
+    def get_leave_ledger(self, emp_id):
+        """Leave balance movements of one employee, oldest first."""
+        return self._all("SELECT * FROM leave_ledger WHERE emp_id = ? ORDER BY entry_id", (emp_id,))
+
+    def submit_case(self, emp_id, category, priority, description):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            case_id = f"CASE-{self._next_id(conn, 'cases')}"
+            conn.execute("INSERT INTO cases (case_id, emp_id, category, priority, description, status, hr_comments, date) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (case_id, emp_id, category, priority, description, "Open", "",
+                          datetime.date.today().strftime("%Y-%m-%d")))
+        return case_id
+
+    def get_all_cases(self):
+        return self._all("SELECT * FROM cases ORDER BY rowid")
+
+    def get_employee_cases(self, emp_id):
+        return self._all("SELECT * FROM cases WHERE emp_id = ? ORDER BY rowid", (emp_id,))
+
+    def search_cases(self, query=None, status=None, emp_id=None, offset=0, limit=20, newest_first=True):
+        """One page of cases matching the words of query (category, description, HR comments)
+        and the filters: (cases, total)."""
+        return self._search("cases", query, status, emp_id, offset, limit, newest_first)
+
+    def _search(self, table, query, status, emp_id, offset, limit, newest_first):
+        # table is one of the two fixed names above, never user input
+        clauses, params = [], []
+        match = fts_query(query)
+        if match:
+            clauses.append(f"rowid IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+            params.append(match)
+        for sql, value in (("status = ?", status), ("emp_id = ?", emp_id)):
+            if value:
+                clauses.append(sql)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        total = self._conn().execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        page = self._all(f"SELECT * FROM {table}{where} ORDER BY rowid {'DESC' if newest_first else 'ASC'} "
+                         "LIMIT ? OFFSET ?", params + [limit, offset])
+        return page, total
+
+    def update_case(self, case_id, status, comments):
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE cases SET status = ?, hr_comments = ? WHERE case_id = ?",
+                               (status, comments, case_id))
+        return cur.rowcount == 1
+
+    def save_payroll_record(self, record):
+        with self._conn() as conn:
+            conn.execute("INSERT INTO payroll_history (emp_id, month, record) VALUES (?, ?, ?)",
+                         (record.get('emp_id'), record.get('month'), json.dumps(record)))
+
+    def get_announcements(self):
+        return self._all("SELECT date, title, message FROM announcements ORDER BY id DESC")
+
+    def add_announcement(self, title, message):
+        with self._conn() as conn:
+            conn.execute("INSERT INTO announcements (date, title, message) VALUES (?, ?, ?)",
+                         (datetime.date.today().strftime("%Y-%m-%d"), title, message))
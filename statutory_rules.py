@@ -0,0 +1,290 @@
+import json
+import os
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "statutory_rules.json")
+
+# Rule type -> {parameter: default}; parameters without a default are required
+RULE_TYPES = {
+    "prorated": {"component": None},
+    "per_ot_hour": {"rate": None},
+    "percent": {"base": None, "rate": None, "below": np.inf, "cap": np.inf},
+    "fixed": {"amount": None},
+    "flat_slabs": {"base": None, "slabs": None, "amount": np.nan},
+    "marginal_slabs": {"base": None, "slabs": None},
+}
+# Parameters that name something rather than hold a number; they cannot vary by group
+STRUCTURAL = {"component", "base"}
+SLAB_PARAMS = {"slabs"}
+
+
+def pad_slabs(slab_lists, width=None):
+    """Stacks (threshold, value) lists into one (lists, slabs, 2) array.
+
+    Shorter lists are padded with an infinite threshold that repeats their last value,
+    which step_table and slab_tax both treat as adding nothing.
+    """
+    arrays = [np.asarray(s, dtype=float).reshape(-1, 2) for s in slab_lists]
+    width = max([len(a) for a in arrays] + [width or 1])
+    out = np.empty((len(arrays), width, 2))
+    for i, a in enumerate(arrays):
+        if (np.diff(a[:, 0]) < 0).any():
+            raise ValueError("Slab thresholds must be in ascending order")
+        out[i, :len(a)] = a
+        out[i, len(a):] = (np.inf, a[-1, 1] if len(a) else 0.0)
+    return out
+
+
+def step_table(base, slabs):
+    """Flat amount due on base: the value of the highest slab whose threshold base exceeds."""
+    slabs = np.asarray(slabs, dtype=float)
+    due = np.zeros(np.broadcast_shapes(np.shape(base), slabs.shape[:-2]))
+    prev = 0.0
+    for k in range(slabs.shape[-2]):
+        threshold, value = slabs[..., k, 0], slabs[..., k, 1]
+        due += (value - prev) * (base > threshold)
+        prev = value
+    return due
+
+
+def slab_tax(gross, slabs):
+    """Tax on monthly gross under progressive slabs.
+
+    slabs: (threshold, rate) pairs in ascending threshold order; each rate applies to the
+    part of gross above its threshold and below the next one. Either a list of pairs or an
+    array whose last two axes are (slab, [threshold, rate]), leading axes broadcasting
+    against gross.
+    """
+    slabs = np.asarray(slabs, dtype=float)
+    tax = np.zeros(np.broadcast_shapes(np.shape(gross), slabs.shape[:-2]))
+    prev_rate = 0.0
+    for k in range(slabs.shape[-2]):
+        # Charging every slab's rate increase on everything above its threshold sums to the marginal tax
+        threshold, rate = slabs[..., k, 0], slabs[..., k, 1]
+        tax += (rate - prev_rate) * np.maximum(gross - threshold, 0.0)
+        prev_rate = rate
+    return tax
+
+
+def _widen(slabs, width):
+    """Pads an (..., slabs, 2) array to width slabs."""
+    missing = width - slabs.shape[-2]
+    if missing <= 0:
+        return slabs
+    pad = np.empty(slabs.shape[:-2] + (missing, 2))
+    pad[..., 0] = np.inf
+    pad[..., 1] = slabs[..., -1:, 1]
+    return np.concatenate([slabs, pad], axis=-2)
+
+
+class Rule:
+    """One earning or deduction head, compiled from its config entry.
+
+    Numeric parameters are stacked into arrays with one row per table: row 0 is the default
+    and the rest are the per-group tables listed under "overrides" (keyed by values of the
+    employee field named in "by"). Evaluating a rule indexes those rows with each
+    employee's table number, so no per-employee branching remains.
+    """
+
+    def __init__(self, spec):
+        self.head = spec.get("head")
+        self.type = spec.get("type")
+        if not self.head or self.type not in RULE_TYPES:
+            raise ValueError(f"Rule {spec!r}: needs a head and a type in {sorted(RULE_TYPES)}")
+        defaults = RULE_TYPES[self.type]
+        unknown = set(spec) - set(defaults) - {"head", "type", "by", "overrides", "description"}
+        if unknown:
+            raise ValueError(f"Rule {self.head!r}: unknown key(s) {', '.join(sorted(unknown))}")
+        base = {p: spec.get(p, d) for p, d in defaults.items()}
+        missing = [p for p, v in base.items() if v is None]
+        if missing:
+            raise ValueError(f"Rule {self.head!r}: missing {', '.join(missing)}")
+
+        self.component = base.get("component")
+        self.base = base.get("base")
+        self.by = spec.get("by")
+        overrides = spec.get("overrides") or {}
+        if overrides and not self.by:
+            raise ValueError(f"Rule {self.head!r}: overrides need a 'by' field")
+        for key, table in overrides.items():
+            bad = set(table) - (set(defaults) - STRUCTURAL)
+            if bad:
+                raise ValueError(f"Rule {self.head!r}, {key!r}: cannot override {', '.join(sorted(bad))}")
+        self.table_of = {key: i + 1 for i, key in enumerate(overrides)}
+        tables = [base] + [{**base, **table} for table in overrides.values()]
+        self.params = {}
+        for p in set(defaults) - STRUCTURAL:
+            values = [t[p] for t in tables]
+            self.params[p] = pad_slabs(values) if p in SLAB_PARAMS else np.array(values, dtype=float)
+
+    def param_names(self):
+        return sorted(self.params)
+
+    def table_index(self, factorized):
+        """Each employee's table row, or None when the rule has a single table.
+
+        factorized: (codes, uniques) of the employee field named by "by", or None.
+        """
+        if not self.table_of or factorized is None:
+            return None
+        codes, uniques = factorized
+        # Unknown or missing values (code -1 picks the trailing 0) fall back to the default table
+        lookup = np.array([self.table_of.get(u, 0) for u in uniques] + [0], dtype=np.int64)
+        return lookup[codes]
+
+    def resolve(self, index, overrides):
+        """Parameter values for this evaluation.
+
+        overrides: {param: (values, mask)} with a leading scenario axis; scenarios whose
+        mask is False keep the configured value.
+        """
+        values = {}
+        for p, table in self.params.items():
+            value = table[0] if index is None else table[index]
+            if p in overrides:
+                ov, mask = overrides[p]
+                if p in SLAB_PARAMS:
+                    width = max(value.shape[-2], ov.shape[-2])
+                    value = np.where(mask[..., None, None], _widen(ov, width), _widen(value, width))
+                else:
+                    value = np.where(mask, ov, value)
+            values[p] = value
+        return values
+
+    def evaluate(self, heads, columns, prorate, ot_hours, params):
+        if self.type == "prorated":
+            return np.asarray(columns[self.component], dtype=float) / 12 * prorate
+        if self.type == "per_ot_hour":
+            return ot_hours * params["rate"]
+        if self.type == "fixed":
+            shape = np.shape(heads["gross_salary"]) if "gross_salary" in heads else np.shape(prorate)
+            return np.broadcast_to(params["amount"], np.broadcast_shapes(shape, np.shape(params["amount"])))
+        base = heads[self.base]
+        if self.type == "percent":
+            return np.where(base < params["below"], np.minimum(base, params["cap"]) * params["rate"], 0.0)
+        if self.type == "flat_slabs":
+            due = step_table(base, params["slabs"])
+            # "amount" replaces whatever the slabs charge with one flat figure
+            return np.where(np.isnan(params["amount"]), due, np.where(due > 0, params["amount"], 0.0))
+        return slab_tax(base, params["slabs"])
+
+
+class StatutoryRules:
+    """Earning and deduction rules loaded from a declarative config and compiled once.
+
+    The config is {"earnings": [rule, ...], "deductions": [rule, ...]}; see
+    statutory_rules.json for the rule types. Rules run in order, so a deduction's base can
+    be any earning, "gross_salary" or an earlier deduction. evaluate() prices a whole batch
+    with array operations; its cost grows with the number of rules, not with how many
+    per-group tables they have.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.earnings = [Rule(spec) for spec in config.get("earnings", [])]
+        self.deductions = [Rule(spec) for spec in config.get("deductions", [])]
+        self.earning_heads = [r.head for r in self.earnings]
+        self.deduction_heads = [r.head for r in self.deductions]
+        heads = self.earning_heads + self.deduction_heads
+        if len(set(heads)) != len(heads) or {"gross_salary", "total_deductions", "net_salary"} & set(heads):
+            raise ValueError("Rule heads must be unique and not reuse the total column names")
+
+        # A base must be computed before the rule that reads it
+        known = set()
+        for rule in self.earnings + [None] + self.deductions:
+            if rule is None:
+                known.add("gross_salary")
+                continue
+            if rule.base is not None and rule.base not in known:
+                raise ValueError(f"Rule {rule.head!r}: base {rule.base!r} is not an earlier head")
+            known.add(rule.head)
+        self._rules = {r.head: r for r in self.earnings + self.deductions}
+
+    @property
+    def fields(self):
+        """Employee fields the rules read: salary components and grouping fields."""
+        return sorted({r.component for r in self.earnings if r.component} | {r.by for r in self._rules.values() if r.by})
+
+    def heads(self):
+        """Every output column: earnings, gross, deductions, then the two totals."""
+        return self.earning_heads + ["gross_salary"] + self.deduction_heads + ["total_deductions", "net_salary"]
+
+    def parameters(self):
+        """Every overridable parameter as "<head>.<param>"."""
+        return [f"{r.head}.{p}" for r in self._rules.values() for p in r.param_names()]
+
+    def _scenario_overrides(self, scenarios):
+        """[{"<head>.<param>": value}] per scenario -> {head: {param: (values, mask)}}."""
+        by_rule = {}
+        keys = {k for s in scenarios for k in s}
+        for key in keys:
+            head, _, param = key.rpartition(".")
+            rule = self._rules.get(head)
+            if rule is None or param not in rule.params:
+                raise ValueError(f"Unknown rule parameter {key!r}")
+            mask = np.array([key in s for s in scenarios])[:, None]
+            fill = next(s[key] for s in scenarios if key in s)
+            values = [s.get(key, fill) for s in scenarios]
+            values = pad_slabs(values)[:, None] if param in SLAB_PARAMS else np.array(values, dtype=float)[:, None]
+            by_rule.setdefault(head, {})[param] = (values, mask)
+        return by_rule
+
+    def evaluate(self, columns, paid_days, ot_hours, working_days=30, scenarios=None):
+        """Salary heads for a batch, as arrays keyed by head name.
+
+        columns: employee field -> array (see fields); grouping fields missing from it use
+        the default tables. scenarios: optional list of {"<head>.<param>": value} overrides,
+        one per scenario; values then gain a leading scenario axis and may be combined with
+        components already shaped (scenarios, employees).
+        """
+        overrides = self._scenario_overrides(scenarios) if scenarios else {}
+        prorate = paid_days / working_days if working_days > 0 else np.zeros_like(paid_days)
+        factorized = {}
+        for field in {r.by for r in self._rules.values() if r.by and r.table_of}:
+            if columns.get(field) is not None:
+                factorized[field] = pd.factorize(np.asarray(columns[field], dtype=object))
+
+        def run(rule):
+            params = rule.resolve(rule.table_index(factorized.get(rule.by)), overrides.get(rule.head, {}))
+            heads[rule.head] = rule.evaluate(heads, columns, prorate, ot_hours, params)
+
+        heads = {}
+        for rule in self.earnings:
+            run(rule)
+        gross = sum(heads[h] for h in self.earning_heads) if self.earnings else np.zeros(np.shape(paid_days))
+        heads["gross_salary"] = gross
+        total = np.zeros(np.shape(gross))
+        for rule in self.deductions:
+            run(rule)
+            total = total + heads[rule.head]
+        heads["total_deductions"] = total
+        heads["net_salary"] = gross - total
+        # Earnings, deductions, then the totals, which is the column order of a batch
+        return {h: heads[h] for h in self.earning_heads + self.deduction_heads
+                + ["gross_salary", "total_deductions", "net_salary"]}
+
+
+def load_rules(source=None):
+    """StatutoryRules from a config dict, a JSON file path, or the bundled default file."""
+    if isinstance(source, StatutoryRules):
+        return source
+    if isinstance(source, dict):
+        return StatutoryRules(source)
+    with open(source or DEFAULT_RULES_PATH) as f:
+        return StatutoryRules(json.load(f))
+
+
+_default_rules = None
+
+
+def default_rules():
+    """Rules from HELIX_RULES_PATH (or the bundled file), compiled once per process."""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = load_rules(os.environ.get("HELIX_RULES_PATH"))
+    return _default_rules
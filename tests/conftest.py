@@ -0,0 +1,18 @@
+import os
+import sys
+
+# The app modules live at the repository root, next to benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from database import SimulatedDatabase  # noqa: E402
+from sqlite_database import SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def db(request, tmp_path):
+    """Each backend, seeded with the demo data."""
+    if request.param == "memory":
+        return SimulatedDatabase()
+    return SQLiteDatabase(str(tmp_path / "helix.db"))
@@ -0,0 +1,24 @@
+import io
+
+from attendance_analytics import ShiftPolicy
+from attendance_import import import_attendance_csv
+
+CSV = """EmpID,Date,Status,CheckIn,CheckOut,OTHours
+EMP002,2023-10-02,Present,09:00,18:00,0
+EMP002,2023-10-03,Present,18:00,09:00,0
+EMP003,2023-10-03,Present,22:00,06:30,0
+"""
+
+
+def test_checkout_before_checkin_is_a_swapped_punch_on_a_day_shift(db):
+    report = import_attendance_csv(io.StringIO(CSV), db)
+    assert (report.rows_imported, report.rows_rejected) == (1, 2)
+    assert [(line, reason) for line, reason, _ in report.rejected_samples] == [
+        (3, "CheckOut 09:00 before CheckIn 18:00"), (4, "CheckOut 06:30 before CheckIn 22:00")]
+    assert db.get_attendance("EMP002", "2023-10-03") is None
+
+
+def test_checkout_before_checkin_ends_an_overnight_shift(db):
+    report = import_attendance_csv(io.StringIO(CSV), db, shift=ShiftPolicy(start="22:00", end="06:00"))
+    assert (report.rows_imported, report.rows_rejected) == (3, 0)
+    assert db.get_attendance("EMP003", "2023-10-03")["check_out"] == "06:30"
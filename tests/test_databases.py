@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from database import SimulatedDatabase
+from sqlite_database import SQLiteDatabase
+
+
+def test_unknown_attendance_status_is_rejected_without_writing(db):
+    with pytest.raises(ValueError, match="Unknown attendance status 'Sick'"):
+        db.add_attendance_log("EMP002", "2023-10-05", "Sick")
+    with pytest.raises(ValueError, match="Unknown attendance status 'Holiday'"):
+        db.add_attendance_logs([("EMP002", "2023-10-06", "Present", "09:00", "18:00", 0),
+                                ("EMP003", "2023-10-06", "Holiday", "", "", 0)])
+    assert len(db.get_attendance_range(None, "2023-10-01", "2023-10-31")) == 0
+
+
+def test_backends_read_back_the_same_attendance(tmp_path):
+    rows = [("EMP002", "2023-10-02", "Present", "09:05", "18:40", 0.5),
+            ("EMP002", "2023-10-03", "Half Day", "09:00", "13:00", 0),
+            ("EMP003", "2023-10-02", "Leave", "", "", 0),
+            ("EMP002", "2023-10-02", "Present", "09:00", "19:00", 1.0)]  # replaces the first row
+    frames = []
+    for db in (SimulatedDatabase(), SQLiteDatabase(str(tmp_path / "helix.db"))):
+        db.add_attendance_logs(rows)
+        assert db.get_attendance("EMP002", "2023-10-02")["check_out"] == "19:00"
+        frame = db.get_attendance_range(["EMP002", "EMP003"], "2023-10-01", "2023-10-31")
+        frames.append(frame.sort_values(["emp_id", "date"]).reset_index(drop=True))
+        assert db.get_daily_attendance("2023-10-02", "2023-10-02").loc[:, ["Present", "Leave"]].values.tolist() == [[1, 1]]
+    memory, sqlite = frames
+    assert memory["emp_id"].tolist() == sqlite["emp_id"].tolist()
+    for column in ("date", "check_in", "check_out", "ot_hours"):
+        assert memory[column].tolist() == sqlite[column].tolist(), column
+    assert memory["status"].astype(str).tolist() == sqlite["status"].astype(str).tolist()
+
+
+def _scanned_stats(db):
+    employees = db.get_all_employees()
+    departments = {}
+    for emp in employees:
+        departments[emp["department"]] = departments.get(emp["department"], 0) + 1
+    return {"headcount": len(employees), "total_ctc": sum(e["ctc"] for e in employees),
+            "department_counts": departments,
+            "open_cases": db.search_cases(status="Open", limit=1)[1]}
+
+
+def test_dashboard_counts_follow_every_write(db):
+    assert db.get_dashboard_stats() == _scanned_stats(db)
+    db.add_employee({"emp_id": "EMP900", "name": "New Joiner", "role": "Employee", "department": "Legal",
+                     "ctc": 750000, "basic": 375000, "hra": 75000, "special": 300000})
+    db.add_employee({"emp_id": "EMP900", "name": "Duplicate", "department": "Sales", "ctc": 1})
+    db.update_ctc("EMP002", 1_234_000)
+    case_id = db.submit_case("EMP002", "IT Asset", "High", "Laptop fan")
+    db.submit_case("EMP003", "Payroll Issue", "Low", "Payslip missing")
+    db.update_case(case_id, "Resolved", "Replaced")
+    stats = db.get_dashboard_stats()
+    assert stats == _scanned_stats(db)
+    assert stats["department_counts"]["Legal"] == 1
+
+
+def test_sqlite_dashboard_counts_are_rebuilt_for_older_files(tmp_path):
+    path = str(tmp_path / "helix.db")
+    db = SQLiteDatabase(path)
+    db.submit_case("EMP002", "IT Asset", "High", "Laptop fan")
+    expected = db.get_dashboard_stats()
+    conn = db._conn()
+    conn.executescript("DROP TABLE dashboard_counts; DROP TABLE department_counts;")
+    assert SQLiteDatabase(path).get_dashboard_stats() == expected
+
+
+def _emp001_logs(db):
+    return db.get_attendance_range(["EMP001"], "2023-01-01", "2030-12-31").values.tolist()
+
+
+def test_snapshot_can_be_saved_over_the_directory_it_was_loaded_from(tmp_path):
+    path = str(tmp_path / "snapshot")
+    SimulatedDatabase().save_snapshot(path)
+    db = SimulatedDatabase(snapshot_dir=path)
+    expected = _emp001_logs(db)
+    assert len(expected) > 0
+    db.add_attendance_log("EMP002", "2023-10-05", "Leave", "", "")
+    db.save_snapshot(path)
+    # The first store still reads its mapped pages after the files under it were replaced
+    assert _emp001_logs(db) == expected
+    reloaded = SimulatedDatabase(snapshot_dir=path)
+    assert _emp001_logs(reloaded) == expected
+    assert reloaded.get_attendance("EMP002", "2023-10-05")["status"] == "Leave"
+    reloaded.save_snapshot(path)
+    assert _emp001_logs(SimulatedDatabase(snapshot_dir=path)) == expected
+    assert os.listdir(str(tmp_path)) == ["snapshot"]
+
+
+@pytest.mark.parametrize("column", ["password", "bank_account", "ifsc", "emp_id; DROP TABLE employees"])
+def test_directory_cannot_be_sorted_by_private_columns(db, column):
+    with pytest.raises(ValueError, match="Cannot sort by"):
+        db.query_employees(sort_by=column)
+    page, total = db.query_employees(sort_by="ctc", descending=True)
+    assert total == len(db.get_all_employees()) and page[0]["ctc"] == max(e["ctc"] for e in page)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from benchmarks.synthetic import generate_attendance, generate_employees
+from utils import PayrollCalculator, batch_row_to_record, split_ctc
+
+FIELDS = ["emp_id", "name", "designation", "department", "month", "paid_days", "working_days",
+          *PayrollCalculator.ATTENDANCE_FIELDS, "gross_salary", "total_deductions", "net_salary"]
+
+
+def test_batch_matches_calculate_salary_to_the_paisa():
+    employees = generate_employees(5000, seed=7)
+    # CTCs to the rupee rather than the thousand, so many heads land on half paisas
+    rng = np.random.default_rng(7)
+    for emp in employees:
+        emp["ctc"] = float(rng.integers(200_000, 3_000_000))
+        emp["basic"], emp["hra"], emp["special"] = split_ctc(emp["ctc"])
+    # The last few hundred have no logs, so the full-month default is covered too
+    columns = ["emp_id", "date", "status", "check_in", "check_out", "ot_hours"]
+    logs = [dict(zip(columns, row)) for row in generate_attendance(employees[:4700], 2023, 10, seed=7)]
+    by_emp = {}
+    for log in logs:
+        by_emp.setdefault(log["emp_id"], []).append(log)
+
+    calc = PayrollCalculator()
+    batch = calc.calculate_batch(employees, logs, "October", 2023)
+    assert len(batch) == len(employees)
+
+    for emp, (_, row) in zip(employees, batch.iterrows()):
+        expected = calc.calculate_salary(emp, by_emp.get(emp["emp_id"], []), "October", 2023)
+        actual = batch_row_to_record(row, calc.rules)
+        for field in FIELDS:
+            assert actual[field] == expected[field], (emp["emp_id"], field)
+        for group in ("earnings", "deductions"):
+            for head, value in expected[group].items():
+                assert actual[group][head] == value, (emp["emp_id"], head)
@@ -0,0 +1,40 @@
+import os
+import time
+
+import pytest
+
+from database import SimulatedDatabase
+from payroll_jobs import COMPLETED, PayrollJobQueue
+from payroll_runner import PayrollRunner
+from utils import PayrollCalculator
+
+
+def _finish(queue, n):
+    jobs = [queue.submit("October", 2023, full=True) for _ in range(n)]
+    deadline = time.monotonic() + 30
+    while not all(job.finished for job in jobs):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert {job.status for job in jobs} == {COMPLETED}
+    return jobs
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_every_completed_job_keeps_its_result(tmp_path, stored):
+    queue = PayrollJobQueue(PayrollRunner(SimulatedDatabase(), PayrollCalculator()),
+                            store_dir=str(tmp_path) if stored else None)
+    jobs = _finish(queue, 3)
+    for job in jobs:
+        assert len(queue.get_result(job.job_id)) == 4
+    # Only with a store to read them back from are older results dropped from memory
+    assert sum(job.result is not None for job in jobs) == (1 if stored else 3)
+
+
+def test_results_survive_a_restart(tmp_path):
+    runner = PayrollRunner(SimulatedDatabase(), PayrollCalculator())
+    first, second = _finish(PayrollJobQueue(runner, store_dir=str(tmp_path)), 2)
+    restarted = PayrollJobQueue(runner, store_dir=str(tmp_path))
+    assert restarted.get_job(first.job_id).status == COMPLETED
+    assert len(restarted.get_result(first.job_id)) == 4
+    os.remove(os.path.join(str(tmp_path), f"{second.job_id}.pkl"))
+    assert restarted.get_result(second.job_id) is None
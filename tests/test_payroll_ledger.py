@@ -0,0 +1,38 @@
+from payroll_ledger import PayrollLedger
+from utils import PayrollCalculator, batch_row_to_record
+
+
+def _batch(month, year, attendance):
+    employees = [{"emp_id": f"E{i}", "name": f"Employee {i}", "basic": 30000.0 * (i + 1),
+                  "hra": 6000.0 * (i + 1), "special": 24000.0 * (i + 1)} for i in range(3)]
+    return PayrollCalculator().calculate_batch(employees, attendance, month, year)
+
+
+def test_employee_history_across_mixed_schema_versions(tmp_path):
+    ledger = PayrollLedger(str(tmp_path))
+    # Finalized before the attendance fields existed
+    old = _batch("August", 2023, []).drop(columns=PayrollCalculator.ATTENDANCE_FIELDS)
+    ledger.finalize(old, 2023, 8)
+    # No logs: the summed attendance columns are whole numbers
+    ledger.finalize(_batch("September", 2023, []), 2023, 9)
+    logs = [{"emp_id": "E1", "status": "Present", "check_in": "09:20", "check_out": "19:05", "ot_hours": 0.5}]
+    ledger.finalize(_batch("October", 2023, logs), 2023, 10)
+
+    history = ledger.get_employee_history("E1")
+    assert history["month"].tolist() == ["October-2023", "September-2023", "August-2023"]
+    records = [batch_row_to_record(row) for _, row in history.iterrows()]
+    assert records[0]["worked_hours"] == 9.75 and records[0]["late_days"] == 1
+    assert records[2]["worked_hours"] == 0.0 and records[2]["ot_hours"] == 0.0
+    assert ledger.get_employee_history("E9").empty
+
+
+def test_two_ledgers_on_one_root_never_share_a_version(tmp_path):
+    first, second = PayrollLedger(str(tmp_path)), PayrollLedger(str(tmp_path))
+    batch = _batch("October", 2023, [])
+    assert first.finalize(batch, 2023, 10)["version"] == 1
+    # second loaded the manifest before first wrote v1
+    assert second.finalize(batch, 2023, 10)["version"] == 2
+    assert first.finalize(batch, 2023, 10)["version"] == 3
+    for ledger in (first, second, PayrollLedger(str(tmp_path))):
+        assert [e["version"] for e in ledger.get_versions(2023, 10)] == [1, 2, 3]
+        assert ledger.get_month_totals(2023, 10)["version"] == 3
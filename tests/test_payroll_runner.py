@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from payroll_runner import PayrollRunner
+from utils import PayrollCalculator
+
+
+def _same(batch, expected):
+    pd.testing.assert_frame_equal(batch.sort_values("emp_id").reset_index(drop=True),
+                                  expected.sort_values("emp_id").reset_index(drop=True), check_dtype=False)
+
+
+def test_rerun_recomputes_only_changed_employees(db):
+    runner = PayrollRunner(db, PayrollCalculator())
+    batch, recomputed = runner.run("October", 2023)
+    assert recomputed == len(batch) == len(db.get_all_employees())
+
+    assert runner.run("October", 2023)[1] == 0
+
+    # Attendance in another month leaves October alone
+    db.add_attendance_log("EMP003", "2023-11-02", "Absent", "", "")
+    assert runner.run("October", 2023)[1] == 0
+
+    db.add_attendance_logs([("EMP002", "2023-10-02", "Absent", "", "", 0),
+                            ("EMP002", "2023-10-03", "Present", "09:00", "21:00", 0)])
+    db.update_ctc("EMP003", 1_500_000)
+    batch, recomputed = runner.run("October", 2023)
+    assert recomputed == 2
+    _same(batch, PayrollRunner(db, PayrollCalculator()).run("October", 2023)[0])
+    assert batch.set_index("emp_id").loc["EMP002", "ot_hours"] == 3.0
+
+
+def test_new_employee_is_appended_and_full_run_recomputes_all(db):
+    runner = PayrollRunner(db, PayrollCalculator())
+    runner.run("October", 2023)
+    db.add_employee({"emp_id": "EMP900", "name": "New Joiner", "role": "Employee", "department": "Sales",
+                     "ctc": 600000, "basic": 300000, "hra": 60000, "special": 240000})
+    batch, recomputed = runner.run("October", 2023)
+    assert recomputed == 1 and "EMP900" in batch["emp_id"].tolist()
+    assert runner.run("October", 2023, full=True)[1] == len(batch)
+
+
+def test_abandoned_run_keeps_the_stored_batch(db):
+    runner = PayrollRunner(db, PayrollCalculator())
+    before, _ = runner.run("October", 2023)
+    db.update_ctc("EMP002", 2_000_000)
+
+    def stop(done, total):
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        runner.run("October", 2023, progress=stop)
+    # The change is still pending and is picked up by the next run
+    batch, recomputed = runner.run("October", 2023)
+    assert recomputed == 1
+    assert batch.set_index("emp_id").loc["EMP002", "gross_salary"] > before.set_index("emp_id").loc["EMP002", "gross_salary"]
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from sqlite_database import SQLiteDatabase
+
+
+def _file(db):
+    ids = [db.submit_request("EMP003", "Annual Leave", "Family trip", days=6),
+           db.submit_request("EMP003", "Sick Leave", "Flu", days=3),
+           db.submit_request("EMP003", "Annual Leave", "Long weekend", days=2),
+           db.submit_request("EMP002", "Work From Home", "Plumber visit")]
+    db.update_request_status(ids[3], "Rejected")
+    return ids
+
+
+def test_bulk_approval_is_partly_applied_oldest_first(db):
+    trip, flu, weekend, wfh = _file(db)
+    result = db.decide_requests([weekend, wfh, "REQ-999999", flu, trip], "Approved")
+    # EMP003 has 10 days: the two older requests take 9, so the weekend no longer fits
+    assert result["decided"] == [trip, flu]
+    assert result["skipped"] == {weekend: "insufficient leave balance (1 of 2 days)", wfh: "already Rejected",
+                                 "REQ-999999": "not found"}
+    assert db.get_employee("EMP003")["leave_balance"] == 1
+    ledger = db.get_leave_ledger("EMP003")
+    assert [(e["req_id"], e["days"], e["balance"]) for e in ledger] == [(trip, -6, 4), (flu, -3, 1)]
+    assert db.search_requests(status="Pending")[1] == 1
+
+    # Deciding again changes nothing
+    assert db.decide_requests([trip, flu], "Approved")["decided"] == []
+    assert len(db.get_leave_ledger("EMP003")) == 2
+    assert db.decide_requests([weekend], "Rejected")["decided"] == [weekend]
+    assert db.get_employee("EMP003")["leave_balance"] == 1
+
+
+def test_unknown_decision_is_refused(db):
+    trip = _file(db)[0]
+    with pytest.raises(ValueError):
+        db.decide_requests([trip], "Maybe")
+    assert db.search_requests(status="Pending")[1] == 3
+
+
+def test_requests_are_searchable_by_employee_id(db):
+    _file(db)
+    assert db.search_requests("EMP003")[1] == 3
+    assert db.search_requests("emp002")[1] == 1
+    assert db.search_requests("EMP003 weekend")[1] == 1
+    assert db.search_requests("EMP00")[1] == 4
+
+
+def test_sqlite_request_index_gains_emp_id_for_older_files(tmp_path):
+    path = str(tmp_path / "helix.db")
+    SQLiteDatabase(path).submit_request("EMP003", "Annual Leave", "Family trip", days=2)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        DROP TRIGGER requests_fts_insert; DROP TRIGGER requests_fts_update; DROP TABLE requests_fts;
+        CREATE VIRTUAL TABLE requests_fts USING fts5(type, details, content='requests', content_rowid='rowid');
+        CREATE TRIGGER requests_fts_insert AFTER INSERT ON requests BEGIN
+            INSERT INTO requests_fts (rowid, type, details) VALUES (new.rowid, new.type, new.details);
+        END;
+        INSERT INTO requests_fts (requests_fts) VALUES ('rebuild');
+    """)
+    conn.close()
+    db = SQLiteDatabase(path)
+    assert db.search_requests("EMP003 trip")[1] == 1
+    db.submit_request("EMP003", "Sick Leave", "Flu", days=1)
+    assert db.search_requests("EMP003")[1] == 2